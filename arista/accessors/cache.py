@@ -0,0 +1,93 @@
+from functools import wraps
+
+from ..core.config import Config
+from ..core.log import getLogger
+from ..core.utils import monotonic
+
+logging = getLogger(__name__)
+
+class CacheStats(object):
+   def __init__(self):
+      self.hits = 0
+      self.misses = 0
+
+   def reset(self):
+      self.hits = 0
+      self.misses = 0
+
+   def __diag__(self, ctx):
+      return {
+         "hits": self.hits,
+         "misses": self.misses,
+      }
+
+cacheStats = {}
+
+def getCacheStats(category):
+   stats = cacheStats.get(category)
+   if stats is None:
+      stats = cacheStats.setdefault(category, CacheStats())
+   return stats
+
+def getCacheTtl(category):
+   ttl = Config().get('cache_ttl_%s' % category)
+   try:
+      return float(ttl) if ttl else 0
+   except ValueError:
+      logging.warning('invalid cache_ttl_%s value %r', category, ttl)
+      return 0
+
+class AccessorCache(object):
+   """Values returned by the getters of one accessor along with their age."""
+   def __init__(self):
+      self.entries = {}
+
+   def get(self, key, category, ttl, func):
+      stats = getCacheStats(category)
+      now = monotonic()
+      entry = self.entries.get(key)
+      if entry is not None and now - entry[0] < ttl:
+         stats.hits += 1
+         return entry[1]
+      stats.misses += 1
+      value = func()
+      self.entries[key] = (now, value)
+      return value
+
+   def invalidate(self):
+      self.entries.clear()
+
+def getAccessorCache(accessor):
+   cache = getattr(accessor, 'cache_', None)
+   if cache is None:
+      cache = AccessorCache()
+      accessor.cache_ = cache
+   return cache
+
+def cachedAccessor(category):
+   """Cache the result of a getter for cache_ttl_<category> seconds.
+
+   The cache is disabled unless the matching Config entry is set.
+   """
+   def decorator(func):
+      @wraps(func)
+      def wrapper(self):
+         ttl = getCacheTtl(category)
+         if ttl <= 0:
+            return func(self)
+         return getAccessorCache(self).get(func.__name__, category, ttl,
+                                           lambda: func(self))
+      return wrapper
+   return decorator
+
+def invalidatesCache(func):
+   """Drop the cached values of an accessor once a setter went to hardware."""
+   @wraps(func)
+   def wrapper(self, *args, **kwargs):
+      try:
+         return func(self, *args, **kwargs)
+      finally:
+         cache = getattr(self, 'cache_', None)
+         if cache is not None:
+            cache.invalidate()
+   return wrapper
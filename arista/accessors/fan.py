@@ -1,27 +1,40 @@
 from ..inventory.fan import Fan
+from ..libs.python import setAttrs
+
+from .cache import cachedAccessor, invalidatesCache
 
 class FanImpl(Fan):
+   __slots__ = ('fanId', 'driver', 'led', 'cache_', '__dict__')
+
    def __init__(self, fanId=1, driver=None, led=None, **kwargs):
       self.fanId = fanId
       self.driver = driver
       self.led = led
-      self.__dict__.update(kwargs)
+      setAttrs(self, kwargs)
 
    def getName(self):
       return 'fan%s' % self.fanId
 
+   @cachedAccessor('speed')
    def getSpeed(self):
       return self.driver.getFanSpeed(self)
 
+   @invalidatesCache
    def setSpeed(self, speed):
       return self.driver.setFanSpeed(self, speed)
 
+   @cachedAccessor('presence')
    def getPresence(self):
       return self.driver.getFanPresence(self)
 
+   def getPresenceReader(self):
+      return getattr(self.driver, 'getFanPresences', None)
+
+   @cachedAccessor('status')
    def getStatus(self):
       return self.driver.getFanStatus(self)
 
+   @cachedAccessor('status')
    def getDirection(self):
       return self.driver.getFanDirection(self)
 
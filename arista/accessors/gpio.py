@@ -1,8 +1,11 @@
 import os.path
 
 from ..inventory.gpio import Gpio
+from ..libs.python import setAttrs
 
 class GpioImpl(Gpio):
+   __slots__ = ('name', 'addr', 'bit', 'ro', 'activeLow', 'path', '__dict__')
+
    def __init__(self, path, name, addr, bit, ro=False, activeLow=False, **kwargs):
       self.name = name
       self.addr = addr
@@ -10,7 +13,7 @@ class GpioImpl(Gpio):
       self.ro = ro
       self.activeLow = activeLow
       self.path = os.path.join(path, name)
-      self.__dict__.update(kwargs)
+      setAttrs(self, kwargs)
 
    def getName(self):
       return self.name
@@ -1,10 +1,13 @@
 from ..inventory.led import Led
+from ..libs.python import setAttrs
 
 class LedImpl(Led):
+   __slots__ = ('name', 'driver', 'colors', '__dict__')
+
    def __init__(self, name=None, driver=None, **kwargs):
       self.name = name
       self.driver = driver
-      self.__dict__.update(kwargs)
+      setAttrs(self, kwargs)
 
    def getColor(self):
       return self.driver.getLedColor(self)
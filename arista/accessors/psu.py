@@ -1,18 +1,28 @@
 from ..inventory.psu import Psu
+from ..libs.python import setAttrs
+
+from .cache import cachedAccessor
 
 class PsuImpl(Psu):
+   __slots__ = ('psuId', 'driver', 'led', 'cache_', '__dict__')
+
    def __init__(self, psuId=1, driver=None, led=None, **kwargs):
       self.psuId = psuId
       self.driver = driver
       self.led = led
-      self.__dict__.update(kwargs)
+      setAttrs(self, kwargs)
 
    def getName(self):
       return 'psu%s' % self.psuId
 
+   @cachedAccessor('presence')
    def getPresence(self):
       return self.driver.getPsuPresence(self)
 
+   def getPresenceReader(self):
+      return getattr(self.driver, 'getPsuPresences', None)
+
+   @cachedAccessor('status')
    def getStatus(self):
       return self.driver.getPsuStatus(self)
 
@@ -20,20 +30,28 @@ class PsuImpl(Psu):
       return self.led
 
 class MixedPsuImpl(Psu):
+   __slots__ = ('psuId', 'presenceDriver', 'statusDriver', 'led', 'cache_',
+                '__dict__')
+
    def __init__(self, psuId=1, presenceDriver=None, statusDriver=None, led=None,
                 **kwargs):
       self.psuId = psuId
       self.presenceDriver = presenceDriver
       self.statusDriver = statusDriver
       self.led = led
-      self.__dict__.update(kwargs)
+      setAttrs(self, kwargs)
 
    def getName(self):
       return 'psu%s' % self.psuId
 
+   @cachedAccessor('presence')
    def getPresence(self):
       return self.presenceDriver.getPsuPresence(self)
 
+   def getPresenceReader(self):
+      return getattr(self.presenceDriver, 'getPsuPresences', None)
+
+   @cachedAccessor('status')
    def getStatus(self):
       return self.statusDriver.getPsuStatus(self)
 
@@ -1,10 +1,13 @@
 from ..inventory.reset import Reset
+from ..libs.python import setAttrs
 
 class ResetImpl(Reset):
+   __slots__ = ('name', 'driver', '__dict__')
+
    def __init__(self, name=None, driver=None, **kwargs):
       self.name = name
       self.driver = driver
-      self.__dict__.update(kwargs)
+      setAttrs(self, kwargs)
 
    def read(self):
       return self.driver.readReset(self)
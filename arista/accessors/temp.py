@@ -1,31 +1,41 @@
 
 from ..inventory.temp import Temp
 from ..core.log import getLogger
+from ..libs.python import setAttrs
+
+from .cache import cachedAccessor, invalidatesCache
 
 logging = getLogger(__name__)
 
 class TempImpl(Temp):
+   __slots__ = ('sensor', 'name', 'driver', 'cache_', '__dict__')
+
    def __init__(self, sensor, driver=None, **kwargs):
       self.sensor = sensor
       self.name = sensor.name
       self.driver = driver
-      self.__dict__.update(kwargs)
+      setAttrs(self, kwargs)
 
    def getName(self):
       return self.name
 
+   @cachedAccessor('presence')
    def getPresence(self):
       return self.driver.getPresence(self.sensor)
 
+   @cachedAccessor('temp')
    def getTemperature(self):
       return self.driver.getTemperature(self.sensor)
 
+   @cachedAccessor('temp')
    def getLowThreshold(self):
       return self.driver.getLowThreshold(self.sensor)
 
+   @invalidatesCache
    def setLowThreshold(self, value):
       return self.driver.setLowThreshold(self.sensor, value)
 
+   @cachedAccessor('temp')
    def getHighThreshold(self):
       try:
          return float(self.sensor.critical)
@@ -33,6 +43,7 @@ class TempImpl(Temp):
          logging.debug("%s sensor missing 'critical' attribute" % self.name)
          return self.driver.getHighThreshold(self.sensor)
 
+   @invalidatesCache
    def setHighThreshold(self, value):
       try:
          self.sensor.critical = value
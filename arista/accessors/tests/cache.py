@@ -0,0 +1,96 @@
+from __future__ import absolute_import, division, print_function
+
+from ...tests.testing import unittest
+
+from ...core.config import Config
+from ...inventory.xcvr import Xcvr
+
+from ..cache import getCacheStats
+from ..fan import FanImpl
+from ..xcvr import XcvrImpl
+
+class FakeFanDriver(object):
+   def __init__(self):
+      self.reads = 0
+
+   def getFanSpeed(self, fan):
+      self.reads += 1
+      return 50
+
+   def getFanDirection(self, fan):
+      self.reads += 1
+      return 'forward'
+
+class FakeXcvrDriver(object):
+   def __init__(self):
+      self.presence = True
+      self.lpMode = False
+      self.reads = 0
+
+   def getXcvrPresence(self, xcvr):
+      self.reads += 1
+      return self.presence
+
+   def getXcvrLowPowerMode(self, xcvr):
+      self.reads += 1
+      return self.lpMode
+
+   def setXcvrLowPowerMode(self, xcvr, value):
+      self.lpMode = value
+
+class AccessorCacheTest(unittest.TestCase):
+   def setUp(self):
+      self.driver = FakeXcvrDriver()
+      self.xcvr = XcvrImpl(driver=self.driver, xcvrId=1, xcvrType=Xcvr.QSFP)
+      self.config = Config()
+      getCacheStats('presence').reset()
+      getCacheStats('control').reset()
+
+   def tearDown(self):
+      self.config.cache_ttl_presence = 0
+      self.config.cache_ttl_control = 0
+      self.config.cache_ttl_status = 0
+      self.config.cache_ttl_speed = 0
+
+   def testDisabledByDefault(self):
+      self.xcvr.getPresence()
+      self.xcvr.getPresence()
+      self.assertEqual(self.driver.reads, 2)
+      self.assertEqual(getCacheStats('presence').misses, 0)
+
+   def testCachedPresence(self):
+      self.config.cache_ttl_presence = 60
+      self.assertTrue(self.xcvr.getPresence())
+      self.driver.presence = False
+      self.assertTrue(self.xcvr.getPresence())
+      self.assertEqual(self.driver.reads, 1)
+      stats = getCacheStats('presence')
+      self.assertEqual((stats.hits, stats.misses), (1, 1))
+
+   def testExpiredEntry(self):
+      self.config.cache_ttl_presence = 1e-9
+      self.xcvr.getPresence()
+      self.xcvr.getPresence()
+      self.assertEqual(self.driver.reads, 2)
+
+   def testWriteInvalidates(self):
+      self.config.cache_ttl_control = 60
+      self.assertFalse(self.xcvr.getLowPowerMode())
+      self.xcvr.setLowPowerMode(True)
+      self.assertTrue(self.xcvr.getLowPowerMode())
+      self.assertEqual(self.driver.reads, 2)
+
+   def testFanDirectionCategory(self):
+      driver = FakeFanDriver()
+      fan = FanImpl(driver=driver)
+      self.config.cache_ttl_speed = 60
+      fan.getDirection()
+      fan.getDirection()
+      self.assertEqual(driver.reads, 2)
+      self.config.cache_ttl_status = 60
+      fan.getDirection()
+      fan.getDirection()
+      self.assertEqual(driver.reads, 3)
+
+if __name__ == '__main__':
+   unittest.main()
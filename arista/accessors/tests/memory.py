@@ -0,0 +1,89 @@
+from __future__ import absolute_import, division, print_function
+
+try:
+   import tracemalloc
+except ImportError:
+   tracemalloc = None
+
+from ...tests.logging import getLogger
+from ...tests.testing import unittest, patch
+
+from ...core.config import Config
+from ...core.fixed import FixedSystem
+from ...core.platform import getPlatforms, loadPlatforms
+from ...descs.sensor import Position, SensorDesc
+from ...inventory.xcvr import Xcvr
+
+from ..led import LedImpl
+from ..xcvr import XcvrImpl
+
+logging = getLogger(__name__)
+
+class DictXcvr(object):
+   '''Dict backed equivalent of XcvrImpl'''
+   def __init__(self, driver=None, interruptLine=None, reset=None, leds=None,
+                **kwargs):
+      self.driver = driver
+      self.interruptLine = interruptLine
+      self.reset = reset
+      self.leds = leds or []
+      self.name = '%s%s' % (Xcvr.typeStr(kwargs['xcvrType']), kwargs['xcvrId'])
+      self.__dict__.update(kwargs)
+
+def tracedSize(func):
+   tracemalloc.start()
+   try:
+      result = func()
+      return tracemalloc.get_traced_memory()[0], result
+   finally:
+      tracemalloc.stop()
+
+class SlotsTest(unittest.TestCase):
+   def testNoInstanceDict(self):
+      xcvr = XcvrImpl(xcvrId=1, xcvrType=Xcvr.QSFP, addr=None)
+      led = LedImpl(name='qsfp1', colors=['green'])
+      sensor = SensorDesc(diode=0, name='sensor', position=Position.OTHER,
+                          target=10, overheat=20, critical=30)
+      for obj in [xcvr, led, sensor]:
+         self.assertFalse(getattr(obj, '__dict__', None))
+
+   def testKwargsExtension(self):
+      xcvr = XcvrImpl(xcvrId=1, xcvrType=Xcvr.QSFP, extra='blah')
+      self.assertEqual(xcvr.extra, 'blah')
+      self.assertEqual(xcvr.__dict__, {'extra': 'blah'})
+      sensor = SensorDesc(diode=0, name='sensor', position=Position.OTHER,
+                          target=10, overheat=20, critical=30, extra='blah')
+      diag = sensor.__diag__(None)
+      self.assertEqual(diag['extra'], 'blah')
+      self.assertEqual(diag['critical'], 30)
+
+@unittest.skipIf(tracemalloc is None, 'tracemalloc is not available')
+class MemoryBenchmarkTest(unittest.TestCase):
+   COUNT = 1000
+
+   def _build(self, cls):
+      return [cls(xcvrId=i, xcvrType=Xcvr.QSFP, addr=None)
+              for i in range(self.COUNT)]
+
+   def testBenchmarkXcvr(self):
+      slotted = min(tracedSize(lambda: self._build(XcvrImpl))[0]
+                    for _ in range(5))
+      dicts = min(tracedSize(lambda: self._build(DictXcvr))[0]
+                  for _ in range(5))
+      logging.info('%d xcvrs: slotted %d bytes, dict backed %d bytes',
+                   self.COUNT, slotted, dicts)
+      self.assertLess(slotted, dicts)
+
+   def testBenchmarkPlatforms(self):
+      loadPlatforms()
+      with patch.object(Config(), 'lazy_components', False):
+         for cls in getPlatforms():
+            if not issubclass(cls, FixedSystem):
+               continue
+            size, platform = tracedSize(cls)
+            inventory = platform.getInventory()
+            logging.info('%s: %d bytes, %d xcvrs, %d leds', cls.__name__, size,
+                         len(inventory.getXcvrs()), len(inventory.getLeds()))
+
+if __name__ == '__main__':
+   unittest.main()
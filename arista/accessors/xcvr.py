@@ -1,6 +1,12 @@
 from ..inventory.xcvr import Xcvr
+from ..libs.python import setAttrs
+
+from .cache import cachedAccessor, invalidatesCache
 
 class XcvrImpl(Xcvr):
+   __slots__ = ('driver', 'interruptLine', 'reset', 'leds', 'name', 'xcvrId',
+                'xcvrType', 'addr', 'cache_', '__dict__')
+
    def __init__(self, driver=None, interruptLine=None, reset=None, leds=None,
                 **kwargs):
       self.driver = driver
@@ -9,29 +15,39 @@ class XcvrImpl(Xcvr):
       self.leds = leds or []
       typeStr = Xcvr.typeStr(kwargs['xcvrType'])
       self.name = '%s%s' % (typeStr, kwargs['xcvrId'])
-      self.__dict__.update(kwargs)
+      setAttrs(self, kwargs)
 
    def getName(self):
       return self.name
 
+   @cachedAccessor('presence')
    def getPresence(self):
       return self.driver.getXcvrPresence(self)
 
+   def getPresenceReader(self):
+      return getattr(self.driver, 'getXcvrPresences', None)
+
+   @cachedAccessor('control')
    def getLowPowerMode(self):
       return self.driver.getXcvrLowPowerMode(self)
 
+   @invalidatesCache
    def setLowPowerMode(self, value):
       return self.driver.setXcvrLowPowerMode(self, value)
 
+   @cachedAccessor('control')
    def getModuleSelect(self):
       return self.driver.getXcvrModuleSelect(self)
 
+   @invalidatesCache
    def setModuleSelect(self, value):
       return self.driver.setXcvrModuleSelect(self, value)
 
+   @cachedAccessor('control')
    def getTxDisable(self):
       return self.driver.getXcvrTxDisable(self)
 
+   @invalidatesCache
    def setTxDisable(self, value):
       return self.driver.setXcvrTxDisable(self, value)
 
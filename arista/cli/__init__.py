@@ -12,8 +12,6 @@ from .parser import CliContext, ActionError
 from .args import getRootParser, registerParser
 from .actions import registerAction
 
-from .. import platforms
-
 from ..core import utils
 from ..core.config import Config
 from ..core.backtrace import loadBacktraceHook
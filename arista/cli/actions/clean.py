@@ -5,7 +5,9 @@ from . import registerAction
 from ..args.clean import cleanParser
 from ...core import utils
 from ...core.config import Config
+from ...core.driver import kernelModules
 from ...core.log import getLogger
+from ...core.snapshot import platformSnapshot
 
 logging = getLogger(__name__)
 
@@ -17,4 +19,7 @@ def doClean(ctx, args):
 
    logging.debug('cleaning up platform')
    with utils.FileLock(Config().lock_file):
-      ctx.platform.clean()
+      with kernelModules.batchUnload():
+         ctx.platform.clean()
+      if not utils.inSimulation():
+         platformSnapshot.clear()
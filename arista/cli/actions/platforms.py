@@ -4,10 +4,11 @@ from __future__ import absolute_import, division, print_function
 from . import registerAction
 from ..args.platforms import platformsParser
 from ...core.fixed import FixedSystem
-from ...core.platform import getPlatformSkus
+from ...core.platform import getPlatformSkus, loadPlatforms
 
 @registerAction(platformsParser, needsPlatform=False)
 def doPlatforms(ctx, args):
+   loadPlatforms()
    print('supported platforms:')
    for plat, cls in sorted(getPlatformSkus().items()):
       if issubclass(cls, FixedSystem):
@@ -9,9 +9,21 @@ from ...core import utils
 from ...core.config import Config
 from ...core.component import Priority
 from ...core.log import getLogger
+from ...core.snapshot import platformSnapshot
+from ...libs import benchmark
 
 logging = getLogger(__name__)
 
+SETUP_TRACE_FILE = 'arista-setup-trace.json'
+
+def writeSetupTrace(tracer):
+   for event in tracer.slowest(category='component'):
+      logging.info('%s took %.3f seconds', event['args']['path'],
+                   event['dur'] / 1e6)
+   trace = utils.JsonStoredData(SETUP_TRACE_FILE)
+   trace.write(tracer.dump(), mode='w')
+   logging.info('setup trace written to %s', trace.path)
+
 def forkForLateInitialization(platform):
    try:
       pid = os.fork()
@@ -30,6 +42,15 @@ def doSetup(ctx, args):
    if args.debug:
       utils.debug = True
 
+   tracer = benchmark.startTracing() if args.profile else None
+   try:
+      _doSetup(platform, args)
+   finally:
+      if tracer is not None:
+         benchmark.stopTracing()
+         writeSetupTrace(tracer)
+
+def _doSetup(platform, args):
    with utils.FileLock(Config().lock_file):
       if args.early or not args.late:
          logging.debug('setting up critical drivers')
@@ -54,3 +75,7 @@ def doSetup(ctx, args):
       if args.early or not args.late:
          if not args.background:
             platform.waitForIt()
+
+      if not utils.inSimulation():
+         # the bus offsets are only known once the drivers are loaded
+         platformSnapshot.store(platform)
@@ -14,4 +14,6 @@ def setupParser(parser):
       help='enable debug features for the drivers')
    parser.add_argument('-b', '--background', action='store_true',
       help='initialize slow, non-critical drivers in background')
+   parser.add_argument('-p', '--profile', action='store_true',
+      help='record the time spent setting up each component and driver')
    addPriorityArgs(parser)
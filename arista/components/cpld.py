@@ -43,16 +43,28 @@ class SysCpld(I2cComponent):
 
    def resetScd(self, sleep=1, wait=True):
       driver = self.drivers['SysCpldI2cDriver']
-      state = driver.regs.scdReset()
-      logging.debug('%s: scd reset: %s', self, state)
-
-      driver.regs.scdReset(1)
+      with driver.regs.snapshot():
+         state = driver.regs.scdReset()
+         logging.debug('%s: scd reset: %s', self, state)
+         driver.regs.update(scdReset=1)
       if wait:
          time.sleep(sleep) # could be lower
-      driver.regs.scdReset(0)
+      driver.regs.update(scdReset=0)
 
    def powerCycleOnSeu(self, value=None):
-      return self.drivers['SysCpldI2cDriver'].regs.powerCycleOnCrc(value)
+      regs = self.drivers['SysCpldI2cDriver'].regs
+      if value is None:
+         return regs.powerCycleOnCrc()
+      return regs.update(powerCycleOnCrc=value)
+
+   def disablePowerCycleOnSeu(self):
+      '''Disable the powercycle on SEU, False if it was already disabled'''
+      regs = self.drivers['SysCpldI2cDriver'].regs
+      with regs.snapshot():
+         if not regs.powerCycleOnCrc():
+            return False
+         regs.update(powerCycleOnCrc=0)
+      return True
 
    def hasSeuError(self):
       return self.drivers['SysCpldI2cDriver'].regs.scdCrcError()
@@ -1,9 +1,7 @@
 import copy
 
-from contextlib import closing
-
-from ..core.utils import SMBus
 from ..core.log import getLogger
+from ..drivers.i2c import i2cBusPool
 from .common import I2cComponent
 
 logging = getLogger(__name__)
@@ -79,7 +77,8 @@ class Ds125Br(I2cComponent):
    def setup(self):
       logging.debug('setting up ds125br repeaters')
 
-      with closing(SMBus(self.addr.bus)) as bus:
+      with i2cBusPool.lease(self.addr.bus, priority=self.priority) as handle:
+         bus = handle.smbus
          for addr, config in self.getPortConfigs():
             self.setupPort(bus, addr, config)
 
@@ -13,7 +13,7 @@ from ..accessors.xcvr import XcvrImpl
 from ..core.config import Config
 from ..core.driver import KernelDriver
 from ..core.types import I2cAddr, MdioClause, MdioSpeed
-from ..core.utils import FileWaiter, MmapResource, simulateWith, writeConfig
+from ..core.utils import simulateWith, writeConfig
 from ..core.log import getLogger
 
 from ..drivers.i2c import I2cKernelDriver
@@ -38,6 +38,8 @@ logging = getLogger(__name__)
 SYS_UIO_PATH = '/sys/class/uio'
 
 class ScdI2cAddr(I2cAddr):
+   __slots__ = ('scd_',)
+
    def __init__(self, scd, bus, addr):
       super(ScdI2cAddr, self).__init__(bus, addr)
       self.scd_ = scd
@@ -46,7 +48,12 @@ class ScdI2cAddr(I2cAddr):
    def bus(self):
       return self.scd_.i2cOffset + self.bus_
 
+   def getOwner(self):
+      return self.scd_
+
 class ScdReset(Reset):
+   __slots__ = ('addr', 'name', 'bit', 'path')
+
    def __init__(self, path, reset):
       self.addr = reset.addr
       self.name = reset.name
@@ -100,9 +107,9 @@ class ScdWatchdog(Watchdog):
    def arm(self, timeout):
       regValue = self.armReg(timeout)
       try:
-         with self.scd.getMmap() as mmap:
-            logging.info('arm reg = {0:32b}'.format(regValue))
-            mmap.write32(self.reg, regValue)
+         mmap = self.scd.getMmap()
+         logging.info('arm reg = {0:32b}'.format(regValue))
+         mmap.write32(self.reg, regValue)
       except RuntimeError as e:
          logging.error("watchdog arm/stop error: {}".format(e))
          return False
@@ -123,10 +130,9 @@ class ScdWatchdog(Watchdog):
    @simulateWith(statusSim)
    def status(self):
       try:
-         with self.scd.getMmap() as mmap:
-            regValue = mmap.read32(self.reg)
-            enabled = bool(regValue >> 31)
-            timeout = regValue & ((1<<16)-1)
+         regValue = self.scd.getMmap().read32(self.reg)
+         enabled = bool(regValue >> 31)
+         timeout = regValue & ((1<<16)-1)
          return { "enabled": enabled, "timeout": timeout }
       except RuntimeError as e:
          logging.error("watchdog status error: {}".format(e))
@@ -141,15 +147,16 @@ class ScdPowerCycle(PowerCycle):
    def powerCycle(self):
       logging.info("Initiating powercycle through SCD")
       try:
-         with self.scd.getMmap() as mmap:
-            mmap.write32(self.reg, self.wr)
-            logging.info("Powercycle triggered by SCD")
-            return True
+         self.scd.getMmap().write32(self.reg, self.wr)
+         logging.info("Powercycle triggered by SCD")
+         return True
       except RuntimeError as e:
          logging.error("powercycle error: %s", e)
          return False
 
 class ScdInterrupt(Interrupt):
+   __slots__ = ('reg', 'bit')
+
    def __init__(self, reg, bit):
       self.reg = reg
       self.bit = bit
@@ -175,18 +182,16 @@ class ScdInterruptRegister(object):
 
    def setReg(self, reg, wr):
       try:
-         with self.scd.getMmap() as mmap:
-            mmap.write32(reg, wr)
-            return True
+         self.scd.getMmap().write32(reg, wr)
+         return True
       except RuntimeError as e:
          logging.error("write register %s with %s: %s", reg, wr, e)
          return False
 
    def readReg(self, reg):
       try:
-         with self.scd.getMmap() as mmap:
-            res = mmap.read32(reg)
-            return hex(res)
+         res = self.scd.getMmap().read32(reg)
+         return hex(res)
       except RuntimeError as e:
          logging.error("read register %s: %s", reg, e)
          return None
@@ -249,7 +254,6 @@ class Scd(PciComponent):
                             ResetSysfsDriver(sysfsPath=self.pciSysfs),
                             XcvrSysfsDriver(sysfsPath=self.pciSysfs)]
       self.smbusMasters = OrderedDict()
-      self.mmapReady = False
       self.interrupts = []
       self.fanGroups = []
       self.leds = []
@@ -266,6 +270,7 @@ class Scd(PciComponent):
       self.mdioMasters = {}
       self.mdios = []
       self.msiRearmOffset = None
+      self.lazy_ = Config().lazy_components
       super(Scd, self).__init__(addr=addr, drivers=drivers, **kwargs)
       self.regs = self.drivers['scd-hwmon'].regs
 
@@ -295,16 +300,34 @@ class Scd(PciComponent):
       return interrupt
 
    def getMmap(self):
-      path = os.path.join(self.pciSysfs, "resource0")
-      if not self.mmapReady:
+      """Return the mapping of the scd registers, shared by all its helpers.
+
+      This is the mapping of the scd-hwmon driver, mapped on first use and
+      kept until clean() or refresh().
+      """
+      hwmon = self.drivers['scd-hwmon']
+      if hwmon.mmap_ is None:
          # check that the scd driver is loaded the first time
          drv = self.drivers['scd']
          if not drv.loaded():
             # This codepath is unlikely to be used
             drv.setup()
-            FileWaiter(path, 5).waitFileReady()
-         self.mmapReady = True
-      return MmapResource(path)
+      try:
+         return hwmon.mmap
+      except IOError as e:
+         raise RuntimeError(str(e))
+
+   def closeMmap(self):
+      self.drivers['scd-hwmon'].unmap()
+
+   def refresh(self):
+      # the resource might have moved after a pci rescan, map it again lazily
+      self.closeMmap()
+      super(Scd, self).refresh()
+
+   def clean(self):
+      self.closeMmap()
+      super(Scd, self).clean()
 
    def i2cAddr(self, bus, addr, t=1, datr=3, datw=3, ed=0):
       addr = ScdI2cAddr(self, bus, addr)
@@ -380,6 +403,18 @@ class Scd(PciComponent):
       return gpioDict
 
    def _addXcvr(self, xcvrId, xcvrType, bus, interruptLine, leds=None, drvName=None):
+      # xcvrs are only created once something asks for them, until then a
+      # placeholder is returned
+      if self.lazy_:
+         return self.defer(lambda: self._createXcvr(xcvrId, xcvrType, bus,
+                                                    interruptLine, leds=leds,
+                                                    drvName=drvName),
+                           categories=['xcvrs', 'resets'])
+      return self._createXcvr(xcvrId, xcvrType, bus, interruptLine, leds=leds,
+                              drvName=drvName)
+
+   def _createXcvr(self, xcvrId, xcvrType, bus, interruptLine, leds=None,
+                   drvName=None):
       addr = self.i2cAddr(bus, Xcvr.ADDR, t=1, datr=0, datw=3, ed=0)
       reset = None
       if xcvrType != Xcvr.SFP:
@@ -456,6 +491,7 @@ class Scd(PciComponent):
 
    def resetOut(self):
       super(Scd, self).resetOut()
+      self.materialize()
       for xcvr in self.xcvrs:
          xcvr.setModuleSelect(True)
          xcvr.setTxDisable(False)
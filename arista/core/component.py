@@ -1,28 +1,183 @@
 from __future__ import print_function
 
-from collections import OrderedDict
+import sys
+import threading
 
-from .driver import KernelDriver
+from collections import OrderedDict, deque
+
+from .config import Config
+from .driver import KernelDriver, kernelModules
+from .inventory import lazyLock
+from .log import getLogger
+from ..libs.benchmark import traced
+
+logging = getLogger(__name__)
 
 DEFAULT_WAIT_TIMEOUT = 15
 
 class Priority(object):
+   # thermal components are set up along with the default ones, their value
+   # only ranks them ahead of the default traffic on a shared bus
+   THERMAL = -1
    DEFAULT = 0
-   THERMAL = 0
    BACKGROUND = 1
    POWER = 1
 
    def priorityFilter(*priorities):
       return staticmethod(lambda component: component.priority in priorities)
 
-   defaultFilter = priorityFilter(DEFAULT)
+   defaultFilter = priorityFilter(THERMAL, DEFAULT)
    backgroundFilter = priorityFilter(BACKGROUND)
 
+   @staticmethod
+   def inherit(priority, parent):
+      '''Children of a background component are set up in the background'''
+      if parent > Priority.DEFAULT:
+         return max(priority, parent)
+      return priority
+
+class SetupEngine(object):
+   '''Sets up the components of a tree, independent subtrees concurrently
+
+   Components are set up in the order of the sequential algorithm: all the
+   children of a component once it is set up, then recursively their own
+   children. A component only waits for its parent and the components it
+   depends on (see Component.getDependencies) so that slow drivers on one
+   bus do not delay unrelated parts of the tree.
+   Components creating kernel devices (see Driver.SERIAL_SETUP) are also set
+   up one after the other in the sequential order, the hwmon numbering the
+   platforms hard-code depends on it.
+   '''
+   def __init__(self, root, filters=Priority.defaultFilter, workers=None):
+      if workers is None:
+         workers = Config().setup_workers
+      self.workers = max(1, int(workers))
+      self.order = []
+      self.parents = {}
+      self.paths = {}
+      self._collect(root, filters, '')
+
+   def _collect(self, component, filters, prefix):
+      for child in component.iterComponents(filters, recursive=False):
+         self.parents[child] = component
+         self.paths[child] = prefix + child.__class__.__name__
+         self.order.append(child)
+      for child in component.iterComponents(recursive=False):
+         path = prefix + child.__class__.__name__
+         self._collect(child, filters, path + '/')
+
+   def setupComponent(self, component):
+      addr = component.addr
+      name = self.paths[component]
+      if addr is not None:
+         name = '%s(%s)' % (name, addr)
+      with traced(name, 'component'):
+         component.setup()
+
+   def getDependencies(self):
+      '''Map each component to the ones to set up before it'''
+      index = dict((component, i) for i, component in enumerate(self.order))
+      deps = OrderedDict()
+      serial = None
+      for component in self.order:
+         candidates = [self.parents[component]] + component.getDependencies()
+         if component.isSerialSetup():
+            candidates.append(serial)
+            serial = component
+         deps[component] = set(dep for dep in candidates
+                               if index.get(dep, len(index)) < index[component])
+      return deps
+
+   def run(self):
+      with kernelModules.cached():
+         self._run()
+
+   def _run(self):
+      # modules are loaded by each driver so that the devices they bind to
+      # are probed in setup order, already loaded ones are skipped
+      if self.workers == 1 or len(self.order) <= 1:
+         for component in self.order:
+            self.setupComponent(component)
+         return
+
+      deps = self.getDependencies()
+      dependents = dict((component, []) for component in deps)
+      for component, required in deps.items():
+         for dep in required:
+            dependents[dep].append(component)
+
+      ready = deque(c for c, required in deps.items() if not required)
+      cond = threading.Condition()
+      state = { 'remaining': len(deps), 'errors': [] }
+
+      def worker():
+         while True:
+            with cond:
+               while not ready and state['remaining'] and not state['errors']:
+                  cond.wait()
+               if not ready or state['errors']:
+                  return
+               component = ready.popleft()
+            try:
+               self.setupComponent(component)
+            except Exception: # pylint: disable=broad-except
+               logging.error('failed to setup %s', component)
+               with cond:
+                  state['errors'].append(sys.exc_info())
+                  cond.notify_all()
+               return
+            with cond:
+               state['remaining'] -= 1
+               for dependent in dependents[component]:
+                  deps[dependent].discard(component)
+                  if not deps[dependent]:
+                     ready.append(dependent)
+               cond.notify_all()
+
+      threads = [threading.Thread(target=worker)
+                 for _ in range(min(self.workers, len(deps)))]
+      for thread in threads:
+         thread.daemon = True
+         thread.start()
+      for thread in threads:
+         thread.join()
+
+      if state['errors']:
+         _, error, _ = state['errors'][0]
+         raise error
+
+class Deferred(object):
+   '''Placeholder for an object created by a function passed to defer()
+
+   Using it creates the pending children of the component, the attributes
+   are then those of the object returned by the function.
+   '''
+   __slots__ = ('component_', 'done_', 'value_')
+
+   def __init__(self, component):
+      self.component_ = component
+      self.done_ = False
+      self.value_ = None
+
+   def resolve(self, value):
+      self.value_ = value
+      self.done_ = True
+
+   def get(self):
+      if not self.done_:
+         self.component_.materialize()
+      return self.value_
+
+   def __getattr__(self, name):
+      return getattr(self.get(), name)
+
 class Component(object):
    def __init__(self, addr=None, priority=Priority.DEFAULT, drivers=None,
                 inventoryCls=None, inventory=None, parent=None, **kwargs):
       super(Component, self).__init__()
-      self.components = []
+      self.components_ = []
+      self.pending_ = []
+      self.materializing_ = False
       self.addr = addr
       self.priority = priority
       self.drivers = OrderedDict()
@@ -37,18 +192,61 @@ class Component(object):
       kwargs = ['%s=%s' % (k, v) for k, v in self.__dict__.items()]
       return '%s(%s)' % (self.__class__.__name__, ', '.join(kwargs))
 
+   @property
+   def components(self):
+      if self.pending_ or self.materializing_:
+         self.materialize()
+      return self.components_
+
+   @components.setter
+   def components(self, components):
+      self.components_ = components
+
+   def defer(self, func, categories=()):
+      '''Postpone func, which creates children, until they are needed
+
+      func is called once the children of this component are iterated or
+      when one of the inventory categories it fills is first accessed.
+      The children end up at the same position as if func had been called
+      right away. The returned placeholder stands for what func returns.
+      '''
+      deferred = Deferred(self)
+      self.pending_.append((len(self.components_), func, deferred))
+      if self.inventory is not None:
+         self.inventory.addLoader(categories, self.materialize)
+      return deferred
+
+   def materialize(self):
+      with lazyLock:
+         # the deferred functions may iterate the children they are creating
+         if self.materializing_:
+            return
+         self.materializing_ = True
+         try:
+            pending, self.pending_ = self.pending_, []
+            shift = 0
+            for position, func, deferred in pending:
+               start = len(self.components_)
+               deferred.resolve(func())
+               added = self.components_[start:]
+               del self.components_[start:]
+               self.components_[position + shift:position + shift] = added
+               shift += len(added)
+         finally:
+            self.materializing_ = False
+
    def addComponents(self, components):
       assert all(isinstance(c, Component) for c in components)
       for component in components:
-         component.priority = max(component.priority, self.priority)
-         self.components.append(component)
+         component.priority = Priority.inherit(component.priority, self.priority)
+         self.components_.append(component)
          component.inventory = self.inventory
       return self
 
    def addComponent(self, component):
       assert isinstance(component, Component)
-      component.priority = max(component.priority, self.priority)
-      self.components.append(component)
+      component.priority = Priority.inherit(component.priority, self.priority)
+      self.components_.append(component)
       component.inventory = self.inventory
       return self
 
@@ -93,19 +291,27 @@ class Component(object):
    def getInventory(self):
       return self.inventory
 
+   def isSerialSetup(self):
+      return any(driver.SERIAL_SETUP for driver in self.drivers.values())
+
+   def getDependencies(self):
+      '''Components that must be set up before this one besides its parent'''
+      getOwner = getattr(self.addr, 'getOwner', None)
+      owner = getOwner() if getOwner is not None else None
+      return [owner] if owner is not None and owner is not self else []
+
    def setup(self):
-      for driver in self.drivers.values():
-         driver.setup()
-      for driver in self.drivers.values():
-         driver.finish()
+      for name, driver in self.drivers.items():
+         with traced(name, 'driver-setup'):
+            driver.setup()
+      for name, driver in self.drivers.items():
+         with traced(name, 'driver-finish'):
+            driver.finish()
 
    def finish(self, filters=Priority.defaultFilter):
       # underlying component are initialized recursively but require the parent to
       # be fully initialized
-      for component in self.iterComponents(filters, recursive=False):
-         component.setup()
-      for component in self.iterComponents(recursive=False):
-         component.finish(filters)
+      SetupEngine(self, filters).run()
 
    def refresh(self):
       for component in self.components:
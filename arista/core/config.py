@@ -22,6 +22,18 @@ class Config(object):
          cls.instance_.reboot_cause_file = 'last_reboot_cause'
          cls.instance_.persistent_presence_check = False
          cls.instance_.lock_file = '/var/lock/arista.lock'
+         # accessor cache lifetimes in seconds, 0 disables the cache
+         cls.instance_.cache_ttl_presence = 0
+         cls.instance_.cache_ttl_status = 0
+         cls.instance_.cache_ttl_temp = 0
+         cls.instance_.cache_ttl_speed = 0
+         cls.instance_.cache_ttl_control = 0
+         # number of threads setting up independent components, 1 is sequential
+         cls.instance_.setup_workers = 1
+         # seconds during which xcvr interrupts are gathered into one event
+         cls.instance_.xcvr_event_coalesce = 0.01
+         # create the xcvr objects of the scds on first use
+         cls.instance_.lazy_components = True
          cls.instance_._parseConfig()
          cls.instance_._parseCmdline()
       return cls.instance_
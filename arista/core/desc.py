@@ -1,10 +1,15 @@
 
 from __future__ import absolute_import, division, print_function
 
+from ..libs.python import getAttrs, setAttrs
+
 class HwDesc(object):
+   # subclasses list their attributes in __slots__, the __dict__ slot is only
+   # populated by extra keyword arguments
+   __slots__ = ('__dict__',)
+
    def __init__(self, **kwargs):
-      for key, value in kwargs.items():
-         setattr(self, key, value)
+      setAttrs(self, kwargs)
 
    def __diag__(self, ctx):
-      return { k : v for k, v in self.__dict__.items() }
+      return getAttrs(self)
@@ -4,9 +4,11 @@ import os
 import subprocess
 
 from collections import OrderedDict
+from contextlib import contextmanager
 
 from .utils import FileWaiter, inDebug, inSimulation
 from .log import getLogger
+from ..libs.benchmark import traced
 
 logging = getLogger(__name__)
 
@@ -17,10 +19,14 @@ def modprobe(name, args=None):
    args = ['modprobe', name.replace('-', '_')] + args
    if inDebug():
       args += [ 'dyndbg=+pf' ]
-   if inSimulation():
-      logging.debug('exec: %s', ' '.join(args))
-   else:
-      subprocess.check_call(args)
+   with traced(name, 'modprobe'):
+      if inSimulation():
+         logging.debug('exec: %s', ' '.join(args))
+      else:
+         try:
+            subprocess.check_call(args)
+         finally:
+            kernelModules.invalidate()
 
 def rmmod(name):
    logging.debug('unloading module %s', name)
@@ -28,15 +34,124 @@ def rmmod(name):
    if inSimulation():
       logging.debug('exec: %s', ' '.join(args))
    else:
-      subprocess.check_call(args)
+      try:
+         subprocess.check_call(args)
+      finally:
+         kernelModules.invalidate()
+
+class KernelModules(object):
+   '''Parsed snapshot of /proc/modules
+
+   /proc/modules is read on every lookup unless within a cached() block, such
+   as a setup or clean pass, where the snapshot is only dropped when modules
+   are loaded or unloaded from here. Modules can also be unloaded in bulk with
+   a single modprobe.
+   '''
+   PROC_MODULES = '/proc/modules'
+
+   def __init__(self):
+      self.modules_ = None
+      self.pending_ = None
+      self.cacheDepth_ = 0
+
+   @staticmethod
+   def normalize(name):
+      return name.replace('-', '_')
+
+   @property
+   def modules(self):
+      '''Map of the loaded modules to the modules using them'''
+      if self.modules_ is None:
+         modules = {}
+         with open(self.PROC_MODULES) as f:
+            for line in f:
+               fields = line.split()
+               users = fields[3] if len(fields) > 3 else '-'
+               modules[fields[0]] = [u for u in users.split(',') if u and u != '-']
+         if not self.cacheDepth_:
+            return modules
+         self.modules_ = modules
+      return self.modules_
+
+   def invalidate(self):
+      self.modules_ = None
+
+   @contextmanager
+   def cached(self):
+      '''Read /proc/modules at most once per change within the block'''
+      self.cacheDepth_ += 1
+      try:
+         yield
+      finally:
+         self.cacheDepth_ -= 1
+         if not self.cacheDepth_:
+            self.invalidate()
+
+   def loaded(self, name):
+      return self.normalize(name) in self.modules
+
+   def unloadOrder(self, names):
+      '''Order modules so that each one is removed before the ones it uses'''
+      modules = self.modules if not inSimulation() else {}
+      names = [self.normalize(n) for n in names]
+      wanted = set(names)
+      order = []
+      visited = set()
+      def visit(name):
+         if name in visited:
+            return
+         visited.add(name)
+         for user in modules.get(name, []):
+            if user in wanted:
+               visit(user)
+         order.append(name)
+      for name in names:
+         visit(name)
+      return order
+
+   def unload(self, names):
+      '''Remove modules with one modprobe, in reverse dependency order'''
+      names = self.unloadOrder(names)
+      if not names:
+         return
+      logging.debug('unloading modules %s', ' '.join(names))
+      args = ['modprobe', '-r', '-a'] + names
+      if inSimulation():
+         logging.debug('exec: %s', ' '.join(args))
+      else:
+         try:
+            subprocess.check_call(args)
+         finally:
+            self.invalidate()
+
+   def remove(self, name):
+      '''Remove a module now or at the end of the current batch'''
+      if self.pending_ is not None:
+         self.pending_.append(name)
+      else:
+         rmmod(name)
+
+   @contextmanager
+   def batchUnload(self):
+      '''Defer the removal of modules to the end of the block'''
+      if self.pending_ is not None:
+         yield
+         return
+      self.pending_ = []
+      try:
+         with self.cached():
+            yield
+      finally:
+         pending, self.pending_ = self.pending_, None
+         try:
+            self.unload(pending)
+         except Exception as e: # pylint: disable=broad-except
+            logging.error('Failed to unload %s: %s', ' '.join(pending), e)
+
+kernelModules = KernelModules()
 
 def isModuleLoaded(name):
-   with open('/proc/modules') as f:
-      start = '%s ' % name.replace('-', '_')
-      for line in f.readlines():
-         if line.startswith(start):
-            return True
-   return False
+   return kernelModules.loaded(name)
 
 _i2cBuses = OrderedDict()
 def getKernelI2cBuses(force=False):
@@ -62,6 +177,10 @@ def i2cBusFromName(name, idx=0, force=False):
    return None
 
 class Driver(object):
+   # the setup creates kernel devices numbered in probe order (e.g. hwmonN)
+   # which the platforms rely on, such drivers are never set up concurrently
+   SERIAL_SETUP = False
+
    def __init__(self, **kwargs):
       self.__dict__.update(kwargs)
 
@@ -77,6 +196,14 @@ class Driver(object):
    def refresh(self):
       pass
 
+   def snapshotState(self):
+      '''Runtime state computed by refresh, None when there is nothing to keep'''
+      return None
+
+   def restoreState(self, state):
+      '''Apply a state from snapshotState(), False if it no longer holds'''
+      return False
+
    def resetIn(self):
       pass
 
@@ -105,6 +232,8 @@ class Driver(object):
       return '%s(%s)' % (self.__class__.__name__, ', '.join(kwargs))
 
 class KernelDriver(Driver):
+   SERIAL_SETUP = True
+
    def __init__(self, waitFile=None, waitTimeout=None, args=None, **kwargs):
       self.args = args if args is not None else []
       self.fileWaiter = FileWaiter(waitFile, waitTimeout)
@@ -115,13 +244,14 @@ class KernelDriver(Driver):
       return '%s(name=%s)' % (self.__class__.__name__, self.driverName)
 
    def setup(self):
-      modprobe(self.module, self.args)
+      if self.args or inSimulation() or not self.loaded():
+         modprobe(self.module, self.args)
       self.fileWaiter.waitFileReady()
 
    def clean(self):
       if self.loaded():
          try:
-            rmmod(self.module)
+            kernelModules.remove(self.module)
          except Exception as e:
             logging.error('Failed to unload %s: %s', self.module, e)
       else:
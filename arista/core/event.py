@@ -0,0 +1,298 @@
+from __future__ import absolute_import, division, print_function
+
+import errno
+import fcntl
+import os
+import select
+import threading
+
+from collections import OrderedDict
+
+try:
+   from queue import Empty, Queue
+except ImportError:
+   from Queue import Empty, Queue
+
+from .log import getLogger
+from .utils import monotonic
+
+logging = getLogger(__name__)
+
+class InterruptSource(object):
+   def __init__(self, key, path, rearm):
+      self.key = key
+      self.path = path
+      self.rearm = rearm
+      self.file = None
+
+   def open(self):
+      self.rearm()
+      self.file = open(self.path)
+      return self.file.fileno()
+
+   def close(self):
+      if self.file is not None:
+         self.file.close()
+         self.file = None
+
+class PolledSource(object):
+   def __init__(self, key, read, interval):
+      self.key = key
+      self.read = read
+      self.interval = interval
+      self.value = read()
+      self.nextPoll = monotonic() + interval
+
+class PresencePoller(object):
+   '''Thread polling the presence of inventory objects without interrupts
+
+   Presences are kept as one bitmap per category and every change is queued
+   as a (key, presence) pair. Objects exposing getPresenceReader() are read
+   in batches through the driver method it returns.
+   A byte is written to the pipe returned by fileno() whenever changes are
+   queued so that the poller can be waited on along with interrupt files.
+   '''
+   def __init__(self, interval=1.):
+      self.interval = interval
+      self.categories = OrderedDict()
+      self.bitmaps = {}
+      self.queue = Queue()
+      self.lock = threading.Lock()
+      self.stopped = threading.Event()
+      self.thread = None
+      self.readFd, self.writeFd = os.pipe()
+      for fd in (self.readFd, self.writeFd):
+         flags = fcntl.fcntl(fd, fcntl.F_GETFL)
+         fcntl.fcntl(fd, fcntl.F_SETFL, flags | os.O_NONBLOCK)
+
+   def add(self, category, key, item):
+      self.categories.setdefault(category, []).append((key, item))
+
+   def fileno(self):
+      return self.readFd
+
+   @staticmethod
+   def readPresences(items):
+      '''Presence of each item, grouping the ones sharing a batch reader'''
+      presences = [None] * len(items)
+      batches = OrderedDict()
+      for i, item in enumerate(items):
+         getReader = getattr(item, 'getPresenceReader', None)
+         reader = getReader() if getReader is not None else None
+         if reader is None:
+            presences[i] = item.getPresence()
+         else:
+            batches.setdefault(reader, []).append(i)
+      for reader, indexes in batches.items():
+         values = reader([items[i] for i in indexes])
+         for i, value in zip(indexes, values):
+            presences[i] = value
+      return presences
+
+   def readBitmap(self, entries):
+      bitmap = 0
+      presences = self.readPresences([item for _, item in entries])
+      for bit, present in enumerate(presences):
+         if present:
+            bitmap |= 1 << bit
+      return bitmap
+
+   def poll(self):
+      '''Read all the presences and queue the changes'''
+      with self.lock:
+         self._poll()
+
+   def _poll(self):
+      changed = False
+      for category, entries in self.categories.items():
+         try:
+            bitmap = self.readBitmap(entries)
+         except (IOError, OSError) as e:
+            logging.debug('failed to poll %s presences: %s', category, e)
+            continue
+         old = self.bitmaps.get(category)
+         self.bitmaps[category] = bitmap
+         if old is None or old == bitmap:
+            continue
+         diff = old ^ bitmap
+         for bit, (key, _) in enumerate(entries):
+            if diff & (1 << bit):
+               self.queue.put((key, bool(bitmap & (1 << bit))))
+               changed = True
+      if changed:
+         try:
+            os.write(self.writeFd, b'1')
+         except OSError as e:
+            if e.errno != errno.EAGAIN:
+               raise
+
+   def reset(self):
+      '''Take the current presences as the new reference'''
+      with self.lock:
+         self.bitmaps = {}
+         self._poll()
+         self.drain()
+
+   def rebaseline(self):
+      '''Take the last polled presences as the new reference
+
+      Unlike reset nothing is read, the changes queued so far are dropped.
+      '''
+      with self.lock:
+         self.drain()
+
+   def drain(self):
+      '''Dict of the changes queued since the last call'''
+      try:
+         while os.read(self.readFd, 64):
+            pass
+      except OSError as e:
+         if e.errno != errno.EAGAIN:
+            raise
+      changes = {}
+      while True:
+         try:
+            key, presence = self.queue.get_nowait()
+         except Empty:
+            return changes
+         changes[key] = presence
+
+   def run(self):
+      while not self.stopped.is_set():
+         try:
+            self.poll()
+         except Exception as e: # pylint: disable=broad-except
+            logging.error('presence poller failed: %s', e)
+         self.stopped.wait(self.interval)
+
+   def start(self):
+      if self.thread is None:
+         self.thread = threading.Thread(target=self.run, name='presence-poller')
+         self.thread.daemon = True
+         self.thread.start()
+
+   def stop(self):
+      self.stopped.set()
+      if self.thread is not None:
+         self.thread.join()
+         self.thread = None
+
+   def close(self):
+      self.stop()
+      if self.readFd is not None:
+         os.close(self.readFd)
+         os.close(self.writeFd)
+         self.readFd = self.writeFd = None
+
+class EventEngine(object):
+   '''Long lived epoll over interrupt files along with periodically read values
+
+   Interrupt files are opened and registered once, only the ones that fired
+   are re-armed. Polled sources are read on their own schedule rather than on
+   every wait so that the cost of a wait is proportional to the number of
+   events instead of the number of sources.
+   Once a first event fired, events keep being collected for coalesce seconds
+   so that lines firing together are reported by a single wait.
+   '''
+   def __init__(self, pollInterval=1., coalesce=0):
+      self.pollInterval = pollInterval
+      self.coalesce = coalesce
+      self.epoll = select.epoll()
+      self.interrupts = {}
+      self.polled = []
+      self.pollers = {}
+
+   def addInterrupt(self, key, path, rearm):
+      '''Watch path, rearm is called before the file is (re)opened'''
+      source = InterruptSource(key, path, rearm)
+      fd = source.open()
+      self.interrupts[fd] = source
+      self.epoll.register(fd, select.EPOLLIN)
+
+   def addPolled(self, key, read, interval=None):
+      '''Report key when the value returned by read changes'''
+      interval = self.pollInterval if interval is None else interval
+      self.polled.append(PolledSource(key, read, interval))
+
+   def addPoller(self, poller):
+      '''Report the changes queued by a PresencePoller'''
+      self.pollers[poller.fileno()] = poller
+      self.epoll.register(poller.fileno(), select.EPOLLIN)
+
+   def resetPolled(self):
+      '''Take the current values as the new reference'''
+      for source in self.polled:
+         source.value = source.read()
+      for poller in self.pollers.values():
+         poller.rebaseline()
+
+   def _rearm(self, fd):
+      source = self.interrupts.pop(fd)
+      self.epoll.unregister(fd)
+      source.close()
+      fd = source.open()
+      self.interrupts[fd] = source
+      self.epoll.register(fd, select.EPOLLIN)
+      return source.key
+
+   def _poll(self, now):
+      events = {}
+      for source in self.polled:
+         if source.nextPoll > now:
+            continue
+         source.nextPoll = now + source.interval
+         value = source.read()
+         if value != source.value:
+            source.value = value
+            events[source.key] = value
+      return events
+
+   def wait(self, timeout=None):
+      '''Wait up to timeout seconds for events, forever if None or negative
+
+      Returns a dict of the keys that fired, mapped to their new value for
+      polled sources and None for interrupts.
+      '''
+      now = monotonic()
+      if self.polled:
+         due = max(0, min(source.nextPoll for source in self.polled) - now)
+         timeout = due if timeout is None or timeout < 0 else min(timeout, due)
+      elif timeout is None:
+         timeout = -1
+
+      events = {}
+      self._dispatch(self._epoll(timeout), events)
+      if events and self.coalesce > 0:
+         deadline = monotonic() + self.coalesce
+         remaining = self.coalesce
+         while remaining > 0:
+            self._dispatch(self._epoll(remaining), events)
+            remaining = deadline - monotonic()
+
+      events.update(self._poll(monotonic()))
+      return events
+
+   def _epoll(self, timeout):
+      try:
+         return self.epoll.poll(timeout)
+      except (IOError, OSError, select.error) as e:
+         if e.args[0] != errno.EINTR:
+            raise
+         return []
+
+   def _dispatch(self, ready, events):
+      for fd, _ in ready:
+         if fd in self.interrupts:
+            events[self._rearm(fd)] = None
+         elif fd in self.pollers:
+            events.update(self.pollers[fd].drain())
+
+   def close(self):
+      for source in self.interrupts.values():
+         source.close()
+      self.interrupts.clear()
+      self.polled = []
+      for poller in self.pollers.values():
+         poller.close()
+      self.pollers.clear()
+      self.epoll.close()
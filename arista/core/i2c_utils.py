@@ -1,10 +1,23 @@
-from ctypes import c_uint8, c_uint16, c_uint32, cast, pointer, POINTER
-from ctypes import create_string_buffer, Structure
+import errno
+
+from ctypes import byref, c_uint8, c_uint16, c_uint32, cast, pointer, POINTER
+from ctypes import Structure
 from fcntl import ioctl
 
 I2C_M_RD = 0x0001
 I2C_RDWR = 0x0707
 
+# limit enforced by the kernel on the number of messages of one I2C_RDWR ioctl
+I2C_RDWR_IOCTL_MAX_MSGS = 42
+
+# the scd smbus masters only handle a register write followed by its data
+SCD_ADAPTER_MAX_MSGS = 2
+
+I2C_ADAPTER_NAME_PATH = '/sys/class/i2c-adapter/i2c-%d/name'
+
+# smallest buffer kept by I2cMsg, fits any SMBus block and its count byte
+I2C_BUFFER_MIN_SIZE = 64
+
 class i2c_msg(Structure):
    _fields_ = [
       ('addr', c_uint16),
@@ -19,26 +32,110 @@ class i2c_rdwr_ioctl_data(Structure):
       ('nmsgs', c_uint32)
    ]
 
-def _makeI2cRdwrRequest(addr, reg, size, data, read):
-   msg_data_type = i2c_msg*2
-   msg_data = msg_data_type()
-   msg_data[0].addr = addr
-   msg_data[0].flags = 0
-   msg_data[0].len = 1
-   msg_data[0].buf = reg
-   msg_data[1].addr = addr
-   msg_data[1].flags = I2C_M_RD if read else 0
-   msg_data[1].len = size
-   msg_data[1].buf = data
-   request = i2c_rdwr_ioctl_data()
-   request.msgs = msg_data
-   request.nmsgs = 2
-   return request
+adapterMaxMsgsCache = {}
+
+def getAdapterMaxMsgs(bus):
+   '''Number of messages a single I2C_RDWR ioctl can carry on bus'''
+   maxMsgs = adapterMaxMsgsCache.get(bus)
+   if maxMsgs is None:
+      maxMsgs = I2C_RDWR_IOCTL_MAX_MSGS
+      try:
+         with open(I2C_ADAPTER_NAME_PATH % bus) as f:
+            if f.read().startswith('SCD '):
+               maxMsgs = SCD_ADAPTER_MAX_MSGS
+      except IOError:
+         pass
+      adapterMaxMsgsCache[bus] = maxMsgs
+   return maxMsgs
+
+class I2cBuffer(object):
+   '''bytearray shared with ctypes so that results need no conversion'''
+   def __init__(self, size):
+      self.data = bytearray(size)
+      self.ptr = cast((c_uint8 * size).from_buffer(self.data), POINTER(c_uint8))
+
+class I2cTransaction(object):
+   '''Batch of register accesses on one adapter
+
+   Every access is a register write followed by a read or write of the data,
+   the accesses are packed into as few I2C_RDWR ioctls as the adapter allows.
+   Adapters rejecting a batch with EINVAL get one access per ioctl instead.
+   '''
+   def __init__(self, maxMsgs=I2C_RDWR_IOCTL_MAX_MSGS):
+      self.maxOps = max(1, maxMsgs // 2)
+      self.ops = []
+
+   def __len__(self):
+      return len(self.ops)
+
+   def read(self, devAddr, command, length):
+      '''Queue a block read, returns the index of its result'''
+      self.ops.append((devAddr, command, length, None))
+      return len(self.ops) - 1
+
+   def write(self, devAddr, command, data):
+      '''Queue a block write, returns the index of its result'''
+      self.ops.append((devAddr, command, len(data), data))
+      return len(self.ops) - 1
+
+   def _submit(self, fd, ops):
+      count = len(ops)
+      msgs = (i2c_msg * (2 * count))()
+      regs = (c_uint8 * count)()
+      buffers = []
+      for i, (devAddr, command, length, data) in enumerate(ops):
+         buf = I2cBuffer(length)
+         if data is not None:
+            buf.data[:] = data
+         buffers.append(buf)
+         regs[i] = command
+         msgs[2 * i].addr = devAddr
+         msgs[2 * i].flags = 0
+         msgs[2 * i].len = 1
+         msgs[2 * i].buf = cast(byref(regs, i), POINTER(c_uint8))
+         msgs[2 * i + 1].addr = devAddr
+         msgs[2 * i + 1].flags = I2C_M_RD if data is None else 0
+         msgs[2 * i + 1].len = length
+         msgs[2 * i + 1].buf = buf.ptr
+      request = i2c_rdwr_ioctl_data()
+      request.msgs = msgs
+      request.nmsgs = 2 * count
+      ioctl(fd, I2C_RDWR, request)
+      return [buf.data if op[3] is None else None
+              for op, buf in zip(ops, buffers)]
+
+   def execute(self, device):
+      '''Run all the queued accesses on device and return their results
+
+      Results are in queuing order, reads return a bytearray and writes None.
+      '''
+      results = []
+      fd = device.fileno()
+      while len(results) < len(self.ops):
+         ops = self.ops[len(results):len(results) + self.maxOps]
+         try:
+            results.extend(self._submit(fd, ops))
+         except (IOError, OSError) as e:
+            if e.errno != errno.EINVAL or len(ops) == 1:
+               raise
+            self.maxOps = 1
+      return results
 
 class I2cMsg(object):
+   '''Single register accesses reusing preallocated ctypes objects'''
    def __init__(self, addr):
       self.addr = addr
       self.device = None
+      self.shared = False
+      self.buffers = {}
+      self.reg = c_uint8()
+      self.msgs = (i2c_msg * 2)()
+      self.msgs[0].flags = 0
+      self.msgs[0].len = 1
+      self.msgs[0].buf = pointer(self.reg)
+      self.request = i2c_rdwr_ioctl_data()
+      self.request.msgs = self.msgs
+      self.request.nmsgs = 2
 
    def __str__(self):
       return '%s(addr=%s, device=%s)' % (self.__class__.__name__, self.addr, self.device)
@@ -47,10 +144,17 @@ class I2cMsg(object):
       if self.device is None:
          self.device = open("/dev/i2c-%d" % self.addr.bus, 'r+b', buffering=0)
 
+   def attach(self, device):
+      '''Use an already opened /dev/i2c-N file owned by someone else'''
+      self.close()
+      self.device = device
+      self.shared = True
+
    def close(self):
-      if self.device:
+      if self.device and not self.shared:
          self.device.close()
-         self.device = None
+      self.device = None
+      self.shared = False
 
    def __enter__(self):
       self.open()
@@ -59,20 +163,42 @@ class I2cMsg(object):
    def __exit__(self, *args):
       self.close()
 
+   def getBuffer(self, length):
+      '''Buffers are sized in powers of two and kept for the next accesses'''
+      size = I2C_BUFFER_MIN_SIZE
+      while size < length:
+         size <<= 1
+      buf = self.buffers.get(size)
+      if buf is None:
+         buf = I2cBuffer(size)
+         self.buffers[size] = buf
+      return buf
+
+   def _rdwr(self, devAddr, command, length, buf, flags):
+      msgs = self.msgs
+      self.reg.value = command
+      msgs[0].addr = devAddr
+      msgs[1].addr = devAddr
+      msgs[1].flags = flags
+      msgs[1].len = length
+      msgs[1].buf = buf.ptr
+      ioctl(self.device.fileno(), I2C_RDWR, self.request)
+
    def setI2cBlock(self, devAddr, command, data):
       length = len(data)
-      result = create_string_buffer(length)
-      for i in range(0, length):
-         cast(result, POINTER(c_uint8))[i] = data[i]
-      reg = c_uint8(command)
-      request = _makeI2cRdwrRequest(devAddr, pointer(reg), length,
-                                    cast(result, POINTER(c_uint8)), 0)
-      ioctl(self.device.fileno(), I2C_RDWR, request)
+      buf = self.getBuffer(length)
+      buf.data[:length] = data
+      self._rdwr(devAddr, command, length, buf, 0)
 
    def getI2cBlock(self, devAddr, command, length):
-      result = create_string_buffer(length)
-      reg = c_uint8(command)
-      request = _makeI2cRdwrRequest(devAddr, pointer(reg), length,
-                                    cast(result, POINTER(c_uint8)), 1)
-      ioctl(self.device.fileno(), I2C_RDWR, request)
-      return [ord(c) for c in result.raw]
+      buf = self.getBuffer(length)
+      self._rdwr(devAddr, command, length, buf, I2C_M_RD)
+      return buf.data[:length]
+
+   def transaction(self):
+      if self.addr is None:
+         return I2cTransaction()
+      return I2cTransaction(maxMsgs=getAdapterMaxMsgs(self.addr.bus))
+
+   def execute(self, transaction):
+      return transaction.execute(self.device)
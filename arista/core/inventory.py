@@ -1,3 +1,5 @@
+import threading
+
 from collections import defaultdict
 
 # NOTE: these import are for inventory objects critical to the .core package
@@ -6,6 +8,9 @@ from ..inventory.reloadcause import ReloadCause
 from ..inventory.slot import Slot
 from ..inventory.watchdog import Watchdog
 
+# serializes the creation of deferred objects, see Component.defer
+lazyLock = threading.RLock()
+
 class Inventory(object):
    def __init__(self):
       self.sfpRange = []
@@ -45,6 +50,22 @@ class Inventory(object):
 
       self.gpios = {}
 
+      self.loaders = defaultdict(list)
+
+   def addLoader(self, categories, loader):
+      '''Call loader before the objects of any of the categories are returned'''
+      for category in categories:
+         self.loaders[category].append(loader)
+
+   def load(self, category=None):
+      # loaders are only popped once done so that other threads wait for them
+      with lazyLock:
+         categories = [category] if category else list(self.loaders)
+         for name in categories:
+            for loader in self.loaders.get(name, []):
+               loader()
+            self.loaders.pop(name, None)
+
    def freeze(self):
       # XXX: compute the range and some basic information from the various
       #      collections present in the inventory
@@ -71,17 +92,21 @@ class Inventory(object):
          self.resets[xcvrReset.getName()] = xcvrReset
 
    def getXcvrs(self):
+      self.load('xcvrs')
       return self.xcvrs
 
    def getXcvr(self, xcvrId):
+      self.load('xcvrs')
       return self.xcvrs[xcvrId]
 
    def getPortToEepromMapping(self):
+      self.load('xcvrs')
       eepromPath = '/sys/class/i2c-adapter/i2c-{0}/{0}-{1:04x}/eeprom'
       return {xcvrId : eepromPath.format(xcvr.addr.bus, xcvr.addr.address)
                for xcvrId, xcvr in self.xcvrs.items()}
 
    def getPortToI2cAdapterMapping(self):
+      self.load('xcvrs')
       return {xcvrId : xcvr.addr.bus for xcvrId, xcvr in self.xcvrs.items()}
 
    # Deprecated
@@ -178,6 +203,7 @@ class Inventory(object):
       self.resets.update(resets)
 
    def getResets(self):
+      self.load('resets')
       return self.resets
 
    def addPhy(self, phy):
@@ -211,6 +237,7 @@ class Inventory(object):
       return self.gpios[name]
 
    def __diag__(self, ctx):
+      self.load()
       return {
          "version": 1,
          "name": self.__class__.__name__,
@@ -1,11 +1,13 @@
 from __future__ import print_function
 
+import importlib
 import os
 
 from .exception import UnknownPlatformError
-from .utils import simulateWith, getCmdlineDict
+from .utils import simulateWith, getCmdlineDict, inSimulation
 from .driver import modprobe
 from .log import getLogger
+from .snapshot import platformSnapshot
 
 from . import prefdl
 
@@ -22,6 +24,11 @@ host_prefdl_path = '/host/.system-prefdl'
 host_prefdl_path_bin = '/host/.system-prefdl-bin'
 fmted_prefdl_path = '/etc/sonic/.syseeprom'
 
+# bump whenever the layout of platform_index.py changes
+PLATFORM_INDEX_VERSION = 1
+PLATFORM_INDEX_PATH = os.path.join(os.path.dirname(__file__),
+                                   'platform_index.py')
+
 def formatPrefdlData(data):
    formatDict = {
       "ASY": ["ASY"],
@@ -119,21 +126,60 @@ def readPlatformName():
 def readHwApi():
    return getSysEeprom().get('HwApi')
 
+def getPlatformIndex():
+   '''Generated sid/sku to module mapping, None when missing or outdated'''
+   try:
+      from . import platform_index
+   except ImportError:
+      return None
+   if getattr(platform_index, 'VERSION', None) != PLATFORM_INDEX_VERSION:
+      logging.debug('ignoring outdated platform index')
+      return None
+   return platform_index
+
+def _lookupPlatform(keys):
+   indexes = {'sid': platformSidIndex, 'sku': platformSkuIndex}
+   for kind, name in keys:
+      platformCls = indexes[kind].get(name)
+      if platformCls is not None:
+         return platformCls
+   return None
+
+def _loadIndexedPlatform(keys):
+   index = getPlatformIndex()
+   if index is None:
+      return False
+   indexes = {'sid': index.SID_INDEX, 'sku': index.SKU_INDEX}
+   for kind, name in keys:
+      module = indexes[kind].get(name)
+      if module is not None:
+         with timeit('Loading platform definition %s' % module):
+            importlib.import_module(module)
+         return True
+   return False
+
+def findPlatformCls(keys):
+   '''Platform matching the first of the (kind, name) keys that is known
+
+   Only the module pointed to by the platform index is imported, all the
+   platforms are loaded when the index cannot resolve any of the keys.
+   '''
+   keys = [(kind, name) for kind, name in keys if name is not None]
+   platformCls = _lookupPlatform(keys)
+   if platformCls is None and _loadIndexedPlatform(keys):
+      platformCls = _lookupPlatform(keys)
+   if platformCls is None:
+      loadPlatforms()
+      platformCls = _lookupPlatform(keys)
+   return platformCls
+
 def detectPlatform():
    getSysEeprom()
 
    sid = readSid()
-   platformCls = platformSidIndex.get(sid)
-   if platformCls is not None:
-      return platformCls
-
    sku = readSku()
-   platformCls = platformSkuIndex.get(sku)
-   if platformCls is not None:
-      return platformCls
-
    name = readPlatformName()
-   platformCls = platformSidIndex.get(name)
+   platformCls = findPlatformCls([('sid', sid), ('sku', sku), ('sid', name)])
    if platformCls is not None:
       return platformCls
 
@@ -143,24 +189,22 @@ def getPlatformCls(*names):
    if not names or not [name for name in names if name]:
       return detectPlatform()
 
+   keys = []
    for name in names:
-      if name is None:
-         continue
-
-      platformCls = platformSkuIndex.get(name)
-      if platformCls is not None:
-         return platformCls
-
-      platformCls = platformSidIndex.get(name)
-      if platformCls is not None:
-         return platformCls
+      keys.extend([('sku', name), ('sid', name)])
+   platformCls = findPlatformCls(keys)
+   if platformCls is not None:
+      return platformCls
 
    raise UnknownPlatformError(names, platforms)
 
 def getPlatform(name=None):
    platformCls = getPlatformCls(name)
    platform = platformCls()
-   platform.refresh()
+   if inSimulation():
+      platform.refresh()
+   else:
+      platformSnapshot.restore(platform)
    return platform
 
 def getPlatformSkus():
@@ -174,9 +218,39 @@ def getPlatforms():
 
 def loadPlatforms():
    with timeit('Loading platform definitions'):
-      from .. import platforms as _
+      from ..platforms import loadAll
+      loadAll()
    logging.debug('Loaded %d platforms', len(platforms))
 
+def generatePlatformIndex():
+   loadPlatforms()
+   return {
+      'sid': {sid: cls.__module__ for sid, cls in platformSidIndex.items()},
+      'sku': {sku: cls.__module__ for sku, cls in platformSkuIndex.items()},
+   }
+
+def _formatIndex(name, index):
+   lines = ['%s = {' % name]
+   lines.extend('   %r: %r,' % item for item in sorted(index.items()))
+   lines.append('}')
+   return lines
+
+def formatPlatformIndex(index):
+   lines = [
+      '# generated by `make platform-index`, do not edit',
+      '',
+      'VERSION = %d' % PLATFORM_INDEX_VERSION,
+      '',
+   ]
+   lines.extend(_formatIndex('SID_INDEX', index['sid']))
+   lines.append('')
+   lines.extend(_formatIndex('SKU_INDEX', index['sku']))
+   return '\n'.join(lines) + '\n'
+
+def writePlatformIndex(path=PLATFORM_INDEX_PATH):
+   with open(path, 'w') as f:
+      f.write(formatPlatformIndex(generatePlatformIndex()))
+
 def registerPlatform():
    def wrapper(cls):
       platforms.append(cls)
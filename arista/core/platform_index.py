@@ -0,0 +1,67 @@
+# generated by `make platform-index`, do not edit
+
+VERSION = 1
+
+SID_INDEX = {
+   'Alhambra': 'arista.platforms.alhambra',
+   'AlhambraSsd': 'arista.platforms.alhambra',
+   'BlackhawkDD': 'arista.platforms.blackhawk',
+   'BlackhawkO': 'arista.platforms.blackhawk',
+   'Clearlake': 'arista.platforms.clearlake',
+   'ClearlakePlus': 'arista.platforms.clearlake',
+   'ClearlakePlusSsd': 'arista.platforms.clearlake',
+   'ClearlakeSsd': 'arista.platforms.clearlake',
+   'Cloverdale': 'arista.platforms.cloverdale',
+   'CloverdaleSsd': 'arista.platforms.cloverdale',
+   'Eagleville': 'arista.platforms.eagleville',
+   'Gardena': 'arista.platforms.gardena',
+   'GardenaE': 'arista.platforms.gardena',
+   'Lodoga': 'arista.platforms.lodoga',
+   'LodogaSsd': 'arista.platforms.lodoga',
+   'Mineral': 'arista.platforms.mineral',
+   'MineralD': 'arista.platforms.mineral',
+   'MineralSsd': 'arista.platforms.mineral',
+   'Smartsville': 'arista.platforms.smartsville',
+   'SmartsvilleBK': 'arista.platforms.smartsville',
+   'SmartsvilleBkMs': 'arista.platforms.smartsville',
+   'SmartsvilleDD': 'arista.platforms.smartsville',
+   'SmartsvilleDDBK': 'arista.platforms.smartsville',
+   'SmartsvilleDDSsd': 'arista.platforms.smartsville',
+   'SmartsvilleSsd': 'arista.platforms.smartsville',
+   'Upperlake': 'arista.platforms.upperlake',
+   'UpperlakeES': 'arista.platforms.upperlake',
+   'UpperlakePlus': 'arista.platforms.upperlake',
+   'UpperlakeSsd': 'arista.platforms.upperlake',
+   'raven': 'arista.platforms.cloverdale',
+}
+
+SKU_INDEX = {
+   'DCS-7050CX3-32S': 'arista.platforms.lodoga',
+   'DCS-7050CX3-32S-SSD': 'arista.platforms.lodoga',
+   'DCS-7050CX3M-32S': 'arista.platforms.eagleville',
+   'DCS-7050QX-32': 'arista.platforms.cloverdale',
+   'DCS-7050QX-32S': 'arista.platforms.clearlake',
+   'DCS-7050QX-32S-SSD': 'arista.platforms.clearlake',
+   'DCS-7050QX2-32S': 'arista.platforms.clearlake',
+   'DCS-7050QX2-32S-SSD': 'arista.platforms.clearlake',
+   'DCS-7060CX-32S': 'arista.platforms.upperlake',
+   'DCS-7060CX-32S-ES': 'arista.platforms.upperlake',
+   'DCS-7060CX-32S-SSD': 'arista.platforms.upperlake',
+   'DCS-7060CX2-32S': 'arista.platforms.upperlake',
+   'DCS-7060DX4-32': 'arista.platforms.blackhawk',
+   'DCS-7060PX4-32': 'arista.platforms.blackhawk',
+   'DCS-7170-32C': 'arista.platforms.mineral',
+   'DCS-7170-32C-M': 'arista.platforms.mineral',
+   'DCS-7170-32CD': 'arista.platforms.mineral',
+   'DCS-7170-64C': 'arista.platforms.alhambra',
+   'DCS-7170-64C-M': 'arista.platforms.alhambra',
+   'DCS-7260CX3-64': 'arista.platforms.gardena',
+   'DCS-7260CX3-64E': 'arista.platforms.gardena',
+   'DCS-7280CR3-32D4': 'arista.platforms.smartsville',
+   'DCS-7280CR3-32D4-M': 'arista.platforms.smartsville',
+   'DCS-7280CR3-32P4': 'arista.platforms.smartsville',
+   'DCS-7280CR3-32P4-M': 'arista.platforms.smartsville',
+   'DCS-7280CR3K-32D4': 'arista.platforms.smartsville',
+   'DCS-7280CR3K-32P4': 'arista.platforms.smartsville',
+   'DCS-7280CR3MK-32P4': 'arista.platforms.smartsville',
+}
@@ -3,9 +3,16 @@ from __future__ import absolute_import, division, print_function
 
 import copy
 import logging
+import threading
+
+from collections import OrderedDict
+from contextlib import contextmanager
 
 from ..libs.integer import iterBits
 
+class SnapshotState(threading.local):
+   snapshot = None
+
 class HardwareHandle(object):
 
    def __str__(self):
@@ -51,6 +58,9 @@ class RegBitField(HardwareHandle):
       return self.readWrite
 
 class Register(HardwareHandle):
+   # per thread snapshot state shared by all the registers of a RegisterMap
+   snapshotState_ = None
+
    def __init__(self, addr, *fields, **kwargs):
       self.parent = kwargs.get('parent')
       self.addr = addr
@@ -68,11 +78,48 @@ class Register(HardwareHandle):
    def dump(self):
       return {}
 
+   def clone(self):
+      '''Cheap per instance copy of a register declared on a RegisterMap'''
+      reg = copy.copy(self)
+      reg.fields = tuple(copy.copy(field) for field in self.fields)
+      return reg
+
+   def setSnapshotState(self, state):
+      self.snapshotState_ = state
+
+   def getSnapshot(self):
+      state = self.snapshotState_
+      return state.snapshot if state is not None else None
+
+   def updateSnapshotBit(self, addr, bitpos, value):
+      snapshot = self.getSnapshot()
+      if snapshot is not None and addr in snapshot:
+         if value:
+            snapshot[addr] |= (1 << bitpos)
+         else:
+            snapshot[addr] &= ~(1 << bitpos)
+
+   def readAddr(self, addr):
+      snapshot = self.getSnapshot()
+      if snapshot is None:
+         return self.parent.read(addr)
+      value = snapshot.get(addr)
+      if value is None:
+         value = snapshot[addr] = self.parent.read(addr)
+      return value
+
+   def writeAddr(self, addr, value):
+      res = self.parent.write(addr, value)
+      snapshot = self.getSnapshot()
+      if snapshot is not None:
+         snapshot[addr] = value
+      return res
+
    def read(self):
-      return self.parent.read(self.addr)
+      return self.readAddr(self.addr)
 
    def write(self, value):
-      return self.parent.write(self.addr, value)
+      return self.writeAddr(self.addr, value)
 
    def readWrite(self, value=None):
       if value is None:
@@ -82,12 +129,25 @@ class Register(HardwareHandle):
    def readBit(self, bitpos):
       return (self.read() >> bitpos) & 1
 
+   @staticmethod
+   def bitMasks(bits):
+      setMask = 0
+      clearMask = 0
+      for bitpos, value in bits.items():
+         if value:
+            setMask |= (1 << bitpos)
+         else:
+            clearMask |= (1 << bitpos)
+      return setMask, clearMask
+
    def writeBit(self, bitpos, value):
+      return self.writeBits({bitpos: value})
+
+   def writeBits(self, bits):
+      '''Update several bits, given as a {bitpos: value} dict, in one RMW'''
+      setMask, clearMask = self.bitMasks(bits)
       regval = self.read()
-      if value:
-         regval |= (1 << bitpos)
-      else:
-         regval &= ~(1 << bitpos)
+      regval = (regval | setMask) & ~clearMask
       return self.write(regval)
 
    def generateFieldAttributes(self, attrs, field):
@@ -120,6 +180,10 @@ class ClearOnReadRegister(Register):
       value = super(ClearOnReadRegister, self).read()
       for bitpos, val in enumerate(iterBits(value)):
          self.cache |= val << bitpos
+      snapshot = self.getSnapshot()
+      if snapshot is not None:
+         # the hardware cleared the register, don't accumulate the bits twice
+         snapshot[self.addr] = 0
       # NOTE: clear on read behavior for users only happens via a readBit
       return self.cache
 
@@ -129,27 +193,114 @@ class SetClearRegister(Register):
       self.addrSet = addrSet
       self.addrClear = addrClear
 
-   def writeBit(self, bitpos, value):
-      addr = self.addrSet if value else self.addrClear
-      self.parent.write(addr, 1 << bitpos)
+   def writeBits(self, bits):
+      setMask, clearMask = self.bitMasks(bits)
+      if setMask:
+         self.parent.write(self.addrSet, setMask)
+      if clearMask:
+         self.parent.write(self.addrClear, clearMask)
+      for bitpos, value in bits.items():
+         self.updateSnapshotBit(self.addr, bitpos, value)
+
+class RegisterLayout(object):
+   '''Attributes exposed by a RegisterMap class and the register behind each'''
+
+   class Parent(object):
+      pass
+
+   def __init__(self, cls):
+      self.attributes = []
+      self.registers = {}
+      parent = self.Parent()
+      for key in dir(cls):
+         reg = getattr(cls, key)
+         if not isinstance(reg, Register):
+            continue
+         for name in reg.clone().generateAttributes(parent):
+            self.attributes.append(name)
+            self.registers[name] = reg
+      logging.debug('%s: computed layout of %d registers', cls.__name__,
+                    len(self.attributes))
 
 class RegisterMap(object):
+   # registers are bound once, the lock only serializes the first accesses
+   bindLock_ = threading.Lock()
+
    def __init__(self, parent):
       self.parent_ = parent
-      self.attributes_ = []
-      for key in dir(self):
-         attr = getattr(self, key)
-         if isinstance(attr, Register):
-            self._updateAttributes(copy.deepcopy(attr))
+      self.attributes_ = self.getLayout().attributes
+      self.snapshotState_ = SnapshotState()
+
+   @classmethod
+   def getLayout(cls):
+      # computed once per class, subclasses must not reuse their parent layout
+      layout = cls.__dict__.get('layout_')
+      if layout is None:
+         layout = RegisterLayout(cls)
+         cls.layout_ = layout
+      return layout
+
+   def __getattr__(self, name):
+      # registers are bound to the instance on first access
+      reg = self.getLayout().registers.get(name)
+      if reg is None:
+         raise AttributeError("'%s' object has no attribute '%s'" %
+                              (self.__class__.__name__, name))
+      with self.bindLock_:
+         # another thread may have bound it while waiting for the lock
+         if name not in self.__dict__:
+            self._updateAttributes(reg.clone())
+      return self.__dict__[name]
 
    def _updateAttributes(self, reg):
+      reg.setSnapshotState(self.snapshotState_)
       attrs = reg.generateAttributes(self.parent_)
       for key, value in attrs.items():
-         logging.debug('registering reg: %s', key)
-         self.attributes_.append(key)
          setattr(self, key, value)
 
+   @contextmanager
+   def snapshot(self):
+      """Read each underlying register at most once within the scope.
+
+      Fields are served from the values read first, writes still go to the
+      hardware and update the snapshot. Nested scopes share the outer one.
+      """
+      if self.snapshotState_.snapshot is not None:
+         yield
+         return
+      self.snapshotState_.snapshot = {}
+      try:
+         yield
+      finally:
+         self.snapshotState_.snapshot = None
+
+   def update(self, **values):
+      """Write several fields or registers at once.
+
+      Bit fields are grouped by register so that each register costs a single
+      read-modify-write, e.g. regs.update(scdReset=1, powerCycleOnCrc=0).
+      """
+      registers = OrderedDict()
+      for name, value in values.items():
+         handle = getattr(getattr(self, name, None), '__self__', None)
+         if isinstance(handle, RegBitField):
+            assert not handle.ro
+            if handle.flip:
+               value = not value
+            registers.setdefault(handle.parent, {})[handle.bitpos] = value
+         elif isinstance(handle, Register):
+            handle.write(value)
+         else:
+            raise AttributeError('%s has no register field %s' %
+                                 (self.__class__.__name__, name))
+      for reg, bits in registers.items():
+         reg.writeBits(bits)
+
    def __diag__(self, ctx):
+      with self.snapshot():
+         return self._diag(ctx)
+
+   def _diag(self, ctx):
       res = []
       for attr in self.attributes_:
          func = getattr(self, attr)
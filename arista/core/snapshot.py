@@ -0,0 +1,109 @@
+from __future__ import absolute_import, division, print_function
+
+from .log import getLogger
+from .utils import BOOT_ID_PATH, JsonStoredData, getBootId
+
+logging = getLogger(__name__)
+
+PLATFORM_SNAPSHOT_FILE = 'arista-platform-snapshot.json'
+
+def iterDrivers(component, path=''):
+   '''Drivers of a component tree along with a key stable across processes
+
+   Children that were not created yet are skipped rather than created, the
+   keys do not depend on the position of a child among its siblings so that
+   they stay the same once the deferred children are created.
+   '''
+   for name, driver in component.drivers.items():
+      yield '%s:%s' % (path, name), driver
+   seen = {}
+   for child in component.components_:
+      label = '%s(%s)' % (child.__class__.__name__, child.addr)
+      seen[label] = seen.get(label, -1) + 1
+      childPath = '%s/%s.%d' % (path, label, seen[label])
+      for item in iterDrivers(child, childPath):
+         yield item
+
+class PlatformSnapshot(object):
+   '''Runtime state of a platform shared by the processes of a boot
+
+   Refreshing a platform syncs its drivers with the kernel (e.g. looking up
+   the i2c bus offsets) which every plugin process used to do on startup.
+   The result is stored under /run along with the boot id so that the
+   following processes only validate it, driver by driver.
+   '''
+   def __init__(self, path=None, bootIdPath=BOOT_ID_PATH):
+      self.data = JsonStoredData(PLATFORM_SNAPSHOT_FILE, path=path)
+      self.bootIdPath = bootIdPath
+
+   def capture(self, platform):
+      states = {}
+      for key, driver in iterDrivers(platform):
+         state = driver.snapshotState()
+         if state is not None:
+            states[key] = state
+      return {
+         'bootId': getBootId(self.bootIdPath),
+         'platform': platform.__class__.__name__,
+         'drivers': states,
+      }
+
+   def store(self, platform):
+      data = self.capture(platform)
+      if data['bootId'] is None:
+         return
+      try:
+         self.data.write(data, mode='w')
+      except (IOError, OSError, AssertionError) as e:
+         logging.debug('failed to store platform snapshot %s: %s',
+                       self.data.path, e)
+
+   def load(self, platform):
+      if not self.data.exist():
+         return None
+      try:
+         data = self.data.read()
+      except (IOError, ValueError) as e:
+         logging.debug('ignoring platform snapshot %s: %s', self.data.path, e)
+         return None
+      if not isinstance(data, dict):
+         return None
+      bootId = getBootId(self.bootIdPath)
+      if bootId is None or data.get('bootId') != bootId or \
+         data.get('platform') != platform.__class__.__name__:
+         return None
+      return data.get('drivers', {})
+
+   def restore(self, platform):
+      '''Refresh platform from the snapshot, False if it had to be refreshed
+
+      Drivers whose state is missing or no longer valid are refreshed and
+      the snapshot is updated accordingly.
+      '''
+      states = self.load(platform)
+      if states is None:
+         platform.refresh()
+         self.store(platform)
+         return False
+
+      restored = True
+      for key, driver in iterDrivers(platform):
+         state = states.get(key)
+         if state is not None and driver.restoreState(state):
+            continue
+         driver.refresh()
+         if driver.snapshotState() is not None:
+            logging.debug('platform snapshot outdated for %s', key)
+            restored = False
+      if not restored:
+         self.store(platform)
+      return restored
+
+   def clear(self):
+      try:
+         self.data.clear()
+      except OSError as e:
+         logging.debug('failed to remove platform snapshot %s: %s',
+                       self.data.path, e)
+
+platformSnapshot = PlatformSnapshot()
@@ -1,9 +1,44 @@
 
 from __future__ import absolute_import, division, print_function
 
+import threading
+import time
+
+from ...tests.logging import getLogger
 from ...tests.testing import unittest, patch
+from ...components.scd import Scd
+from ...core.component import Component, Deferred, Priority, SetupEngine
+from ...core.config import Config
+from ...core.driver import Driver
 from ...core.fixed import FixedSystem
+from ...core.inventory import Inventory
 from ...core.platform import loadPlatforms, getPlatforms
+from ...libs import benchmark
+
+logging = getLogger(__name__)
+
+class OwnedAddr(object):
+   def __init__(self, owner):
+      self.owner = owner
+
+   def getOwner(self):
+      return self.owner
+
+   def __str__(self):
+      return 'owned'
+
+class RecordingComponent(Component):
+   def __init__(self, name, log, delay=0, **kwargs):
+      super(RecordingComponent, self).__init__(**kwargs)
+      self.name = name
+      self.log = log
+      self.delay = delay
+
+   def setup(self):
+      time.sleep(self.delay)
+      self.log.append(self.name)
+      if self.name == 'broken':
+         raise RuntimeError('broken component')
 
 class ComponentTest(unittest.TestCase):
    def testSetup(self):
@@ -24,5 +59,219 @@ class ComponentTest(unittest.TestCase):
                # python2 mock version can be outdated, it will be check by py3
                mock.assert_called_once()
 
+class SetupEngineTest(unittest.TestCase):
+   def _buildTree(self, log):
+      root = Component()
+      scd = root.newComponent(RecordingComponent, 'scd', log, delay=0.05)
+      scd.newComponent(RecordingComponent, 'psu1', log, delay=0.1)
+      scd.newComponent(RecordingComponent, 'psu2', log, delay=0.1)
+      cpu = root.newComponent(RecordingComponent, 'cpu', log)
+      cpu.newComponent(RecordingComponent, 'syscpld', log, addr=OwnedAddr(scd))
+      cpu.newComponent(RecordingComponent, 'slow', log,
+                       priority=Priority.BACKGROUND)
+      return root
+
+   def testSequentialOrder(self):
+      log = []
+      SetupEngine(self._buildTree(log), workers=1).run()
+      self.assertEqual(log, ['scd', 'cpu', 'psu1', 'psu2', 'syscpld'])
+
+   def testParallel(self):
+      log = []
+      engine = SetupEngine(self._buildTree(log), workers=4)
+      start = time.time()
+      engine.run()
+      elapsed = time.time() - start
+      self.assertEqual(sorted(log), ['cpu', 'psu1', 'psu2', 'scd', 'syscpld'])
+      for parent, child in [('scd', 'psu1'), ('scd', 'psu2'),
+                            ('cpu', 'syscpld'), ('scd', 'syscpld')]:
+         self.assertLess(log.index(parent), log.index(child))
+      # both psus are set up at the same time
+      self.assertLess(elapsed, 0.2)
+
+   def testSerialSetup(self):
+      class HwmonDriver(Driver):
+         SERIAL_SETUP = True
+
+      log = []
+      root = Component()
+      first = root.newComponent(RecordingComponent, 'first', log,
+                                drivers=[HwmonDriver()])
+      plain = root.newComponent(RecordingComponent, 'plain', log)
+      first.newComponent(RecordingComponent, 'firstChild', log, delay=0.05,
+                         drivers=[HwmonDriver()])
+      plain.newComponent(RecordingComponent, 'plainChild', log,
+                         drivers=[HwmonDriver()])
+      SetupEngine(root, workers=4).run()
+      # kernel devices are created in the sequential order
+      serial = [name for name in log if name != 'plain']
+      self.assertEqual(serial, ['first', 'firstChild', 'plainChild'])
+
+   def testDefaultWorkers(self):
+      self.assertEqual(SetupEngine(Component()).workers, 1)
+
+   def testBackgroundFilter(self):
+      log = []
+      SetupEngine(self._buildTree(log), Priority.backgroundFilter).run()
+      self.assertEqual(log, ['slow'])
+
+   def testThermalFilter(self):
+      log = []
+      root = Component()
+      cpu = root.newComponent(RecordingComponent, 'cpu', log)
+      cpu.newComponent(RecordingComponent, 'temp', log,
+                       priority=Priority.THERMAL)
+      slow = cpu.newComponent(RecordingComponent, 'slow', log,
+                              priority=Priority.BACKGROUND)
+      slowTemp = slow.newComponent(RecordingComponent, 'slowTemp', log,
+                                   priority=Priority.THERMAL)
+      self.assertEqual(slowTemp.priority, Priority.BACKGROUND)
+      SetupEngine(root).run()
+      self.assertEqual(log, ['cpu', 'temp'])
+
+   def testTracing(self):
+      log = []
+      tracer = benchmark.startTracing()
+      try:
+         SetupEngine(self._buildTree(log), workers=4).run()
+      finally:
+         benchmark.stopTracing()
+      paths = sorted(e['args']['path'] for e in tracer.dump()['traceEvents'])
+      self.assertEqual(paths, [
+         'RecordingComponent',
+         'RecordingComponent',
+         'RecordingComponent/RecordingComponent',
+         'RecordingComponent/RecordingComponent',
+         'RecordingComponent/RecordingComponent(owned)',
+      ])
+      slowest = tracer.slowest(count=2, category='component')
+      self.assertTrue(all(e['dur'] >= 100000 for e in slowest))
+
+   def testError(self):
+      log = []
+      root = Component()
+      broken = root.newComponent(RecordingComponent, 'broken', log)
+      broken.newComponent(RecordingComponent, 'child', log)
+      root.newComponent(RecordingComponent, 'other', log)
+      threads = threading.active_count()
+      with self.assertRaises(RuntimeError):
+         SetupEngine(root, workers=4).run()
+      self.assertNotIn('child', log)
+      self.assertEqual(threading.active_count(), threads)
+
+class NamedComponent(Component):
+   def __init__(self, name, **kwargs):
+      super(NamedComponent, self).__init__(**kwargs)
+      self.name = name
+
+class LazyComponentTest(unittest.TestCase):
+   def _names(self, components):
+      return [c.name for c in components]
+
+   def testDeferOrder(self):
+      root = Component(inventory=Inventory())
+      root.newComponent(NamedComponent, 'a')
+      root.defer(lambda: root.newComponent(NamedComponent, 'b'))
+      root.newComponent(NamedComponent, 'c')
+      root.defer(lambda: [root.newComponent(NamedComponent, name)
+                          for name in ['d', 'e']])
+      self.assertEqual(self._names(root.components_), ['a', 'c'])
+      self.assertEqual(self._names(root.components), ['a', 'b', 'c', 'd', 'e'])
+      self.assertEqual(root.pending_, [])
+
+   def testInventoryCategory(self):
+      inventory = Inventory()
+      root = Component(inventory=inventory)
+      calls = []
+      def load():
+         calls.append(1)
+         inventory.addPsu('psu')
+      root.defer(load, categories=['psus'])
+      root.defer(lambda: inventory.xcvrs.update({1: 'xcvr'}),
+                 categories=['xcvrs'])
+      self.assertEqual(inventory.getPsus(), [])
+      self.assertEqual(inventory.getXcvrs(), {1: 'xcvr'})
+      self.assertEqual(inventory.getPsus(), ['psu'])
+      root.materialize()
+      inventory.getXcvrs()
+      self.assertEqual(calls, [1])
+
+   def testDeferredPlaceholder(self):
+      root = Component(inventory=Inventory())
+      deferred = root.defer(lambda: root.newComponent(NamedComponent, 'a'))
+      self.assertEqual(root.components_, [])
+      self.assertEqual(deferred.name, 'a')
+      self.assertIs(deferred.get(), root.components_[0])
+
+   def testConcurrentMaterialize(self):
+      inventory = Inventory()
+      root = Component(inventory=inventory)
+      calls = []
+      def load():
+         calls.append(1)
+         time.sleep(0.01)
+         for i in range(3):
+            root.newComponent(NamedComponent, str(i))
+            inventory.xcvrs[i] = 'xcvr%d' % i
+      root.defer(load, categories=['xcvrs'])
+
+      seen = []
+      def run(getter):
+         seen.append(len(getter()))
+      threads = [threading.Thread(target=run, args=(getter,))
+                 for getter in [lambda: root.components, inventory.getXcvrs] * 2]
+      for thread in threads:
+         thread.start()
+      for thread in threads:
+         thread.join()
+      # created once and nobody saw a partially loaded tree
+      self.assertEqual(calls, [1])
+      self.assertEqual(seen, [3] * 4)
+
+   def testScdXcvrPlaceholder(self):
+      cls = self._fixedPlatforms()[0]
+      platform = self._build(cls, True)
+      scd = next(c for c in platform.iterComponents(filters=None)
+                 if isinstance(c, Scd))
+      deferred = scd.addQsfp(0x500, 1000, 0)
+      self.assertIsInstance(deferred, Deferred)
+      self.assertEqual(deferred.xcvrId, 1000)
+      self.assertIs(deferred.get(), platform.getInventory().getXcvrs()[1000])
+
+   def _fixedPlatforms(self):
+      loadPlatforms()
+      return [cls for cls in getPlatforms() if issubclass(cls, FixedSystem)]
+
+   def _build(self, cls, lazy):
+      with patch.object(Config(), 'lazy_components', lazy):
+         return cls()
+
+   def _describe(self, platform):
+      inventory = platform.getInventory()
+      return ([(c.__class__.__name__, str(c.addr))
+               for c in platform.iterComponents(filters=None)],
+              sorted(inventory.getXcvrs()),
+              sorted(inventory.getResets()))
+
+   def testLazyPlatforms(self):
+      for cls in self._fixedPlatforms():
+         eager = self._build(cls, False)
+         lazy = self._build(cls, True)
+         self.assertEqual(self._describe(lazy), self._describe(eager))
+
+   def testBenchmarkConstruction(self):
+      cls = max(self._fixedPlatforms(),
+                key=lambda c: len(self._build(c, False).getInventory().xcvrs))
+      times = {False: [], True: []}
+      for _ in range(5):
+         for lazy in (False, True):
+            start = time.time()
+            for _ in range(10):
+               self._build(cls, lazy).getInventory().getPsus()
+            times[lazy].append((time.time() - start) / 10)
+      # timings are only logged, they are too noisy to be asserted on
+      logging.info('%s construction: eager %.2fms, lazy %.2fms', cls.__name__,
+                   min(times[False]) * 1000, min(times[True]) * 1000)
+
 if __name__ == '__main__':
    unittest.main()
@@ -0,0 +1,84 @@
+from __future__ import absolute_import, division, print_function
+
+import os
+import tempfile
+
+from ...tests.testing import unittest, patch
+from ...libs.fs import rmfile
+
+from ..component import Component, SetupEngine
+from ..driver import KernelDriver, KernelModules
+
+PROC_MODULES = '''\
+scd_hwmon 45056 0 - Live 0x0000000000000000 (O)
+scd 28672 1 scd_hwmon, Live 0x0000000000000000 (O)
+lm75 20480 0 - Live 0x0000000000000000
+i2c_dev 20480 0 - Live 0x0000000000000000
+'''
+
+def mock_inSimulation():
+   return False
+
+@patch('arista.core.driver.inSimulation', mock_inSimulation)
+class KernelModulesTest(unittest.TestCase):
+   def setUp(self):
+      fd, self.path = tempfile.mkstemp(prefix='unittest-arista-modules-')
+      os.write(fd, PROC_MODULES.encode())
+      os.close(fd)
+      self.modules = KernelModules()
+      self.modules.PROC_MODULES = self.path
+
+   def tearDown(self):
+      rmfile(self.path)
+
+   def testSnapshot(self):
+      self.assertTrue(self.modules.loaded('scd-hwmon'))
+      self.assertTrue(self.modules.loaded('i2c-dev'))
+      self.assertFalse(self.modules.loaded('max6697'))
+      self.assertEqual(self.modules.modules['scd'], ['scd_hwmon'])
+      with self.modules.cached():
+         self.assertTrue(self.modules.loaded('lm75'))
+         rmfile(self.path)
+         # the snapshot is kept until modules are loaded or unloaded
+         self.assertTrue(self.modules.loaded('lm75'))
+         self.modules.invalidate()
+         self.assertRaises(IOError, self.modules.loaded, 'lm75')
+      self.assertIsNone(self.modules.modules_)
+
+   def testExternalChanges(self):
+      self.assertFalse(self.modules.loaded('max6697'))
+      with open(self.path, 'a') as f:
+         f.write('max6697 16384 0 - Live 0x0000000000000000\n')
+      # outside of a setup or clean pass the changes are seen right away
+      self.assertTrue(self.modules.loaded('max6697'))
+
+   @patch('subprocess.check_call')
+   def testSetupOrder(self, check_call):
+      root = Component()
+      for module in ['max6697', 'lm75', 'i2c-dev', 'tmp468']:
+         root.newComponent(Component, drivers=[KernelDriver(module=module)])
+      with patch('arista.core.driver.kernelModules', self.modules):
+         SetupEngine(root, workers=4).run()
+      # modules are loaded one by one in setup order, skipping the loaded ones
+      self.assertEqual([c[0][0] for c in check_call.call_args_list],
+                       [['modprobe', 'max6697'], ['modprobe', 'tmp468']])
+
+   @patch('subprocess.check_call')
+   def testBatchUnload(self, check_call):
+      with self.modules.batchUnload():
+         for name in ['scd', 'lm75', 'scd-hwmon']:
+            self.modules.remove(name)
+         self.assertFalse(check_call.called)
+      check_call.assert_called_once_with(
+         ['modprobe', '-r', '-a', 'scd_hwmon', 'scd', 'lm75'])
+
+   @patch('subprocess.check_call')
+   def testKernelDriverSetup(self, check_call):
+      with patch('arista.core.driver.kernelModules', self.modules):
+         KernelDriver(module='lm75').setup()
+         self.assertFalse(check_call.called)
+         KernelDriver(module='lm75', args=['foo=1']).setup()
+         check_call.assert_called_once_with(['modprobe', 'lm75', 'foo=1'])
+
+if __name__ == '__main__':
+   unittest.main()
@@ -0,0 +1,218 @@
+from __future__ import absolute_import, division, print_function
+
+import fcntl
+import os
+import threading
+
+from ...tests.testing import unittest
+
+from ..event import EventEngine, PresencePoller
+
+class FakeLine(object):
+   '''Interrupt line backed by a pipe, clearing it drains the pipe'''
+   def __init__(self):
+      self.readFd, self.writeFd = os.pipe()
+      flags = fcntl.fcntl(self.readFd, fcntl.F_GETFL)
+      fcntl.fcntl(self.readFd, fcntl.F_SETFL, flags | os.O_NONBLOCK)
+      self.path = '/proc/self/fd/%d' % self.readFd
+      self.rearmed = 0
+
+   def fire(self):
+      os.write(self.writeFd, b'1')
+
+   def clear(self):
+      self.rearmed += 1
+      try:
+         os.read(self.readFd, 64)
+      except OSError:
+         pass
+
+   def close(self):
+      os.close(self.readFd)
+      os.close(self.writeFd)
+
+class FakePresence(object):
+   def __init__(self, present=False):
+      self.present = present
+      self.reads = 0
+
+   def read(self):
+      self.reads += 1
+      return self.present
+
+class FakeItem(object):
+   def __init__(self, present=False):
+      self.present = present
+
+   def getPresence(self):
+      return self.present
+
+class FailingItem(FakeItem):
+   '''Item whose first presence reads fail unexpectedly'''
+   def __init__(self, failures, present=False):
+      super(FailingItem, self).__init__(present)
+      self.failures = failures
+
+   def getPresence(self):
+      if self.failures:
+         self.failures -= 1
+         raise RuntimeError('unexpected failure')
+      return self.present
+
+class FakeBatchDriver(object):
+   def __init__(self):
+      self.batches = []
+
+   def getPresences(self, items):
+      self.batches.append(len(items))
+      return [item.present for item in items]
+
+class FakeBatchItem(FakeItem):
+   def __init__(self, driver, present=False):
+      super(FakeBatchItem, self).__init__(present)
+      self.driver = driver
+
+   def getPresenceReader(self):
+      return self.driver.getPresences
+
+class PresencePollerTest(unittest.TestCase):
+   def setUp(self):
+      self.poller = PresencePoller(interval=0.01)
+      self.driver = FakeBatchDriver()
+      self.xcvrs = [FakeBatchItem(self.driver) for _ in range(3)]
+      self.fans = [FakeItem(True) for _ in range(2)]
+      for i, item in enumerate(self.xcvrs):
+         self.poller.add('sfp', ('sfp', i), item)
+      for i, item in enumerate(self.fans):
+         self.poller.add('fan', ('fan', i), item)
+
+   def tearDown(self):
+      self.poller.close()
+
+   def testBatchedRead(self):
+      self.xcvrs[1].present = True
+      self.poller.reset()
+      self.assertEqual(self.driver.batches, [3])
+      self.assertEqual(self.poller.bitmaps, {'sfp': 0b010, 'fan': 0b11})
+
+   def testChanges(self):
+      self.poller.reset()
+      self.assertEqual(self.poller.drain(), {})
+      self.xcvrs[2].present = True
+      self.fans[0].present = False
+      self.poller.poll()
+      self.assertEqual(self.poller.drain(),
+                       {('sfp', 2): True, ('fan', 0): False})
+      self.poller.poll()
+      self.assertEqual(self.poller.drain(), {})
+
+   def testReset(self):
+      self.poller.reset()
+      self.xcvrs[0].present = True
+      self.poller.poll()
+      self.poller.reset()
+      self.assertEqual(self.poller.drain(), {})
+
+   def testEngineWakeup(self):
+      engine = EventEngine()
+      try:
+         self.poller.reset()
+         engine.addPoller(self.poller)
+         self.poller.start()
+         self.xcvrs[0].present = True
+         self.assertEqual(engine.wait(1), {('sfp', 0): True})
+      finally:
+         engine.close()
+      self.assertIsNone(self.poller.thread)
+
+   def testEngineResetPolled(self):
+      engine = EventEngine()
+      try:
+         self.poller.reset()
+         engine.addPoller(self.poller)
+         self.xcvrs[0].present = True
+         self.poller.poll()
+         batches = len(self.driver.batches)
+         engine.resetPolled()
+         # the poller bitmaps are the reference, nothing is read again
+         self.assertEqual(len(self.driver.batches), batches)
+         self.assertEqual(engine.wait(0), {})
+         self.xcvrs[0].present = False
+         self.poller.poll()
+         self.assertEqual(engine.wait(0), {('sfp', 0): False})
+      finally:
+         engine.close()
+
+   def testUnexpectedError(self):
+      self.poller.reset()
+      item = FailingItem(2)
+      self.poller.add('psu', ('psu', 1), item)
+      self.poller.start()
+      item.present = True
+      for _ in range(100):
+         if self.poller.bitmaps.get('psu'):
+            break
+         self.poller.stopped.wait(0.01)
+      # the thread survived the failures and kept polling
+      self.assertEqual(item.failures, 0)
+      self.assertTrue(self.poller.thread.is_alive())
+      self.assertEqual(self.poller.bitmaps.get('psu'), 1)
+
+class EventEngineTest(unittest.TestCase):
+   def setUp(self):
+      self.engine = EventEngine(pollInterval=0.05)
+      self.lines = [FakeLine() for _ in range(4)]
+      for i, line in enumerate(self.lines):
+         self.engine.addInterrupt(('sfp', i), line.path, line.clear)
+
+   def tearDown(self):
+      self.engine.close()
+      for line in self.lines:
+         line.close()
+
+   def testInterrupt(self):
+      self.assertEqual(self.engine.wait(0), {})
+      self.lines[2].fire()
+      self.assertEqual(self.engine.wait(1), {('sfp', 2): None})
+      # only the line that fired is re-armed
+      self.assertEqual([line.rearmed for line in self.lines], [1, 1, 2, 1])
+      self.assertEqual(self.engine.wait(0), {})
+
+   def testPolled(self):
+      presence = FakePresence()
+      self.engine.addPolled(('psu', 1), presence.read)
+      self.assertEqual(self.engine.wait(0), {})
+      self.assertEqual(presence.reads, 1)
+      presence.present = True
+      self.assertEqual(self.engine.wait(1), {('psu', 1): True})
+      self.assertEqual(presence.reads, 2)
+      # not polled again before its interval
+      self.assertEqual(self.engine.wait(0), {})
+      self.assertEqual(presence.reads, 2)
+
+   def testCoalesce(self):
+      self.engine.coalesce = 0.5
+      timer = threading.Timer(0.05, self.lines[3].fire)
+      self.lines[0].fire()
+      timer.start()
+      try:
+         self.assertEqual(self.engine.wait(1), {('sfp', 0): None,
+                                                ('sfp', 3): None})
+      finally:
+         timer.join()
+
+   def testNoCoalesce(self):
+      self.lines[0].fire()
+      self.assertEqual(self.engine.wait(1), {('sfp', 0): None})
+      self.lines[3].fire()
+      self.assertEqual(self.engine.wait(1), {('sfp', 3): None})
+
+   def testResetPolled(self):
+      presence = FakePresence()
+      self.engine.addPolled(('fan', 1), presence.read)
+      presence.present = True
+      self.engine.resetPolled()
+      self.assertEqual(self.engine.wait(0.1), {})
+
+if __name__ == '__main__':
+   unittest.main()
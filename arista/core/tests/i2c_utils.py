@@ -0,0 +1,179 @@
+from __future__ import absolute_import, division, print_function
+
+import errno
+import os
+import shutil
+import tempfile
+import timeit
+
+from ...tests.testing import unittest, patch
+from ...tests.logging import getLogger
+
+from ..i2c_utils import (
+   I2C_M_RD,
+   I2C_RDWR_IOCTL_MAX_MSGS,
+   SCD_ADAPTER_MAX_MSGS,
+   I2cMsg,
+   I2cTransaction,
+   getAdapterMaxMsgs,
+)
+from ..types import I2cAddr
+
+class FakeDevice(object):
+   def fileno(self):
+      return -1
+
+class FakeAdapter(object):
+   '''Records the I2C_RDWR ioctls and answers reads with the register value'''
+   def __init__(self, maxMsgs=I2C_RDWR_IOCTL_MAX_MSGS):
+      self.maxMsgs = maxMsgs
+      self.requests = []
+      self.writes = []
+
+   def ioctl(self, fd, op, request):
+      msgs = request.msgs
+      if request.nmsgs > self.maxMsgs:
+         raise IOError(errno.EINVAL, os.strerror(errno.EINVAL))
+      self.requests.append(request.nmsgs)
+      for i in range(0, request.nmsgs, 2):
+         reg = msgs[i].buf[0]
+         msg = msgs[i + 1]
+         if msg.flags & I2C_M_RD:
+            for j in range(msg.len):
+               msg.buf[j] = (reg + j) & 0xff
+         else:
+            self.writes.append((msg.addr, reg, msg.buf[:msg.len]))
+
+class I2cTransactionTest(unittest.TestCase):
+   def setUp(self):
+      self.adapter = FakeAdapter()
+      patcher = patch('arista.core.i2c_utils.ioctl', self.adapter.ioctl)
+      patcher.start()
+      self.addCleanup(patcher.stop)
+
+   def testSingleRoundTrip(self):
+      transaction = I2cTransaction()
+      transaction.read(0x10, 0x20, 3)
+      transaction.write(0x11, 0x30, [1, 2])
+      transaction.read(0x12, 0x40, 1)
+      results = transaction.execute(FakeDevice())
+      self.assertEqual(results, [bytearray([0x20, 0x21, 0x22]), None,
+                                 bytearray([0x40])])
+      self.assertEqual(self.adapter.requests, [6])
+      self.assertEqual(self.adapter.writes, [(0x11, 0x30, [1, 2])])
+
+   def testMessageLimit(self):
+      transaction = I2cTransaction(maxMsgs=4)
+      for reg in range(5):
+         transaction.read(0x10, reg, 1)
+      results = transaction.execute(FakeDevice())
+      self.assertEqual(results, [bytearray([reg]) for reg in range(5)])
+      self.assertEqual(self.adapter.requests, [4, 4, 2])
+
+   def testAdapterLimit(self):
+      self.adapter.maxMsgs = SCD_ADAPTER_MAX_MSGS
+      transaction = I2cTransaction()
+      for reg in range(3):
+         transaction.read(0x10, reg, 1)
+      results = transaction.execute(FakeDevice())
+      self.assertEqual(results, [bytearray([reg]) for reg in range(3)])
+      # the rejected batch was not recorded and is replayed one access at a time
+      self.assertEqual(self.adapter.requests, [2, 2, 2])
+      transaction.read(0x10, 0x3, 1)
+      transaction.execute(FakeDevice())
+      self.assertEqual(self.adapter.requests[3:], [2, 2, 2, 2])
+
+   def testAdapterErrors(self):
+      self.adapter.maxMsgs = 0
+      transaction = I2cTransaction()
+      transaction.read(0x10, 0x1, 1)
+      with self.assertRaises(IOError):
+         transaction.execute(FakeDevice())
+
+   def testI2cMsgBlocks(self):
+      msg = I2cMsg(None)
+      msg.attach(FakeDevice())
+      self.assertEqual(msg.getI2cBlock(0x10, 0x5, 2), bytearray([0x5, 0x6]))
+      msg.setI2cBlock(0x10, 0x6, [3])
+      self.assertEqual(self.adapter.writes, [(0x10, 0x6, [3])])
+      msg.close()
+      self.assertIsNone(msg.device)
+
+   def testI2cMsgReusesBuffers(self):
+      msg = I2cMsg(None)
+      msg.attach(FakeDevice())
+      first = msg.getI2cBlock(0x10, 0x1, 33)
+      self.assertIs(msg.getBuffer(2), msg.getBuffer(33))
+      self.assertIsNot(msg.getBuffer(33), msg.getBuffer(65))
+      second = msg.getI2cBlock(0x10, 0x2, 33)
+      self.assertEqual(first[0], 0x1)
+      self.assertEqual(second[0], 0x2)
+
+class AdapterMaxMsgsTest(unittest.TestCase):
+   def setUp(self):
+      self.tmpdir = tempfile.mkdtemp(prefix='unittest-arista-i2c-')
+      self.addCleanup(shutil.rmtree, self.tmpdir)
+      path = os.path.join(self.tmpdir, 'i2c-%d-name')
+      for patcher in [
+            patch('arista.core.i2c_utils.I2C_ADAPTER_NAME_PATH', path),
+            patch('arista.core.i2c_utils.adapterMaxMsgsCache', {}),
+         ]:
+         patcher.start()
+         self.addCleanup(patcher.stop)
+      self.path = path
+
+   def writeName(self, bus, name):
+      with open(self.path % bus, 'w') as f:
+         f.write(name + '\n')
+
+   def testAdapters(self):
+      self.writeName(2, 'SCD 0000:02:00.0 SMBus master 0 bus 0')
+      self.writeName(3, 'i801_smbus')
+      self.assertEqual(getAdapterMaxMsgs(2), SCD_ADAPTER_MAX_MSGS)
+      self.assertEqual(getAdapterMaxMsgs(3), I2C_RDWR_IOCTL_MAX_MSGS)
+      self.assertEqual(getAdapterMaxMsgs(4), I2C_RDWR_IOCTL_MAX_MSGS)
+
+   def testScdTransaction(self):
+      self.writeName(2, 'SCD 0000:02:00.0 SMBus master 0 bus 0')
+      adapter = FakeAdapter(maxMsgs=SCD_ADAPTER_MAX_MSGS)
+      with patch('arista.core.i2c_utils.ioctl', adapter.ioctl):
+         msg = I2cMsg(I2cAddr(2, 0x10))
+         msg.attach(FakeDevice())
+         transaction = msg.transaction()
+         transaction.read(0x10, 0x9e, 1)
+         transaction.read(0x10, 0xfd, 1)
+         self.assertEqual(msg.execute(transaction),
+                          [bytearray([0x9e]), bytearray([0xfd])])
+      # sized from the adapter, nothing got rejected
+      self.assertEqual(adapter.requests, [2, 2])
+
+class I2cMsgBenchmark(unittest.TestCase):
+   @classmethod
+   def setUpClass(cls):
+      cls.logger = getLogger(cls.__name__)
+
+   def testBenchmark(self):
+      with patch('arista.core.i2c_utils.ioctl', lambda fd, op, request: 0):
+         msg = I2cMsg(None)
+         msg.attach(FakeDevice())
+         number = 5000
+
+         def preallocated():
+            msg.getI2cBlock(0x10, 0x20, 33)
+
+         def allocated():
+            transaction = I2cTransaction()
+            transaction.read(0x10, 0x20, 33)
+            transaction.execute(msg.device)
+
+         # interleave both variants to be less sensitive to noisy neighbours
+         reused = fresh = float('inf')
+         for _ in range(5):
+            reused = min(reused, timeit.timeit(preallocated, number=number))
+            fresh = min(fresh, timeit.timeit(allocated, number=number))
+      # timings are only logged, they are too noisy to be asserted on
+      self.logger.info('block read: %.3fus allocating, %.3fus preallocated',
+                       fresh / number * 1e6, reused / number * 1e6)
+
+if __name__ == '__main__':
+   unittest.main()
@@ -3,11 +3,34 @@
 
 from __future__ import absolute_import, division, print_function
 
-from ...tests.testing import unittest
+import os
+import subprocess
+import sys
+
+from ...tests.logging import getLogger
+from ...tests.testing import unittest, patch
 
 from .. import platform
+from ..exception import UnknownPlatformError
 from ..fixed import FixedSystem
 
+logging = getLogger(__name__)
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.dirname(
+   os.path.dirname(os.path.abspath(__file__)))))
+
+LOOKUP_SCRIPT = '''
+import sys, time
+from arista.core import platform
+start = time.time()
+if %(full)r:
+   platform.loadPlatforms()
+cls = platform.getPlatformCls(%(name)r)
+elapsed = time.time() - start
+loaded = [m for m in sys.modules if m.startswith('arista.platforms.')]
+print(cls.__name__, elapsed, len(loaded))
+'''
+
 class UniqueKeyDict(dict):
    def __setitem__(self, key, value):
       assert key not in self, \
@@ -45,5 +68,53 @@ class RegisterTest(unittest.TestCase):
             continue
          cls()
 
+class PlatformIndexTest(unittest.TestCase):
+   def _lookup(self, name, full=False):
+      output = subprocess.check_output(
+         [sys.executable, '-c', LOOKUP_SCRIPT % {'name': name, 'full': full}],
+         cwd=ROOT_PATH)
+      clsName, elapsed, loaded = output.decode().split()
+      return clsName, float(elapsed), int(loaded)
+
+   def _sample(self):
+      return sorted(platform.getPlatformIndex().SKU_INDEX.items())[0]
+
+   def testIndexUpToDate(self):
+      with open(platform.PLATFORM_INDEX_PATH) as f:
+         current = f.read()
+      generated = platform.formatPlatformIndex(platform.generatePlatformIndex())
+      self.assertEqual(current, generated,
+                       'platform index outdated, run make platform-index')
+
+   def testIndexedLookup(self):
+      sku, module = self._sample()
+      clsName, _, loaded = self._lookup(sku)
+      cls = platform.getPlatformCls(sku)
+      self.assertEqual(clsName, cls.__name__)
+      self.assertEqual(cls.__module__, module)
+      self.assertLess(loaded, len(set(platform.getPlatformIndex().SKU_INDEX.values())))
+
+   def testFallback(self):
+      sku, module = self._sample()
+      with patch.object(platform, 'getPlatformIndex', return_value=None):
+         self.assertEqual(platform.getPlatformCls(sku).__module__, module)
+         self.assertRaises(UnknownPlatformError, platform.getPlatformCls,
+                           'unknown')
+
+   def testBenchmarkStartup(self):
+      sku, _ = self._sample()
+      indexed = []
+      full = []
+      for _ in range(5):
+         indexed.append(self._lookup(sku))
+         full.append(self._lookup(sku, full=True))
+      logging.info('platform lookup: indexed %.1fms (%d modules), '
+                   'full load %.1fms (%d modules)',
+                   min(r[1] for r in indexed) * 1000, indexed[0][2],
+                   min(r[1] for r in full) * 1000, full[0][2])
+      # most of the cost is shared by all platforms (components, drivers)
+      # so only the number of platform modules imported is asserted on
+      self.assertLess(indexed[0][2], full[0][2])
+
 if __name__ == '__main__':
    unittest.main()
@@ -21,12 +21,13 @@ from ...inventory.psu import Psu
 from ...inventory.xcvr import Xcvr
 
 from .. import utils
+from ..component import Priority
 from ..driver import Driver
 from ..fixed import FixedSystem
-from ..platform import getPlatformSkus
+from ..platform import getPlatformSkus, loadPlatforms
 from ..types import I2cAddr
 
-from ... import platforms as _
+loadPlatforms()
 
 def mock_i2cBusFromName(name, idx=0, force=False):
    assert isinstance(name, str)
@@ -228,7 +229,8 @@ class MockTest(unittest.TestCase):
    def testComponents(self):
       def _testSubcomponentPriority(component):
          for sub in component.components:
-            assert sub.priority >= component.priority
+            if component.priority > Priority.DEFAULT:
+               assert sub.priority >= component.priority
             _testSubcomponentPriority(sub)
 
       for name, platform in getPlatformSkus().items():
@@ -1,7 +1,11 @@
 from __future__ import absolute_import, division, print_function
 
-from ...tests.testing import unittest
+import threading
+import time
 
+from ...tests.testing import unittest, patch
+
+from ...drivers.scd import ScdResetRegister
 from ..diag import DiagContext
 from ..register import (
    ClearOnReadRegister,
@@ -74,6 +78,20 @@ class FakeDriver(object):
       self.regmap[reg] = value
       return value
 
+class CountingDriver(FakeDriver):
+   def __init__(self):
+      super(CountingDriver, self).__init__()
+      self.reads = 0
+      self.writes = 0
+
+   def read(self, reg):
+      self.reads += 1
+      return super(CountingDriver, self).read(reg)
+
+   def write(self, reg, value):
+      self.writes += 1
+      return super(CountingDriver, self).write(reg, value)
+
 class CoreRegisterTest(unittest.TestCase):
    def setUp(self):
       self.driver = FakeDriver()
@@ -145,6 +163,50 @@ class CoreRegisterTest(unittest.TestCase):
       self.assertEqual(regs.bit0(), 0)
       self.assertEqual(regs2.bit0(), 1)
 
+   def testLayout(self):
+      class ExtendedRegisterMap(FakeRegisterMap):
+         EXTRA = Register(0x09, name='extra')
+
+      layout = FakeRegisterMap.getLayout()
+      self.assertIs(layout, FakeRegisterMap.getLayout())
+      self.assertIs(self.regs.attributes_, layout.attributes)
+      self.assertIn('bit3', layout.attributes)
+      self.assertIn('scratchpad', layout.attributes)
+      self.assertNotIn('extra', layout.attributes)
+
+      extended = ExtendedRegisterMap(self.driver)
+      self.assertIn('extra', extended.attributes_)
+      self.assertIsNot(ExtendedRegisterMap.getLayout(), layout)
+
+      # fields of a register are bound together on first access
+      self.assertNotIn('scratchpad', vars(self.regs))
+      self.regs.bit3()
+      self.assertIs(self.regs.scratchpad.__self__, self.regs.bit3.__self__.parent)
+      self.assertIsNot(self.regs.scratchpad.__self__, self.regs.SCRATCHPAD)
+
+      with self.assertRaises(AttributeError):
+         self.regs.unknownField()
+
+   def testConcurrentBind(self):
+      clone = ClearOnReadRegister.clone
+      def slowClone(reg):
+         time.sleep(0.01)
+         return clone(reg)
+
+      bound = []
+      def run():
+         bound.append(self.regs.clear0.__self__.parent)
+      with patch.object(ClearOnReadRegister, 'clone', slowClone):
+         threads = [threading.Thread(target=run) for _ in range(4)]
+         for thread in threads:
+            thread.start()
+         for thread in threads:
+            thread.join()
+      # every thread got the same clone, the one kept on the instance
+      self.assertEqual(len(bound), 4)
+      for reg in bound:
+         self.assertIs(reg, self.regs.clear1.__self__.parent)
+
    def testClearOnRead(self):
       driver = self.driver
       regs = self.regs
@@ -200,5 +262,106 @@ class CoreRegisterTest(unittest.TestCase):
       self.assertEqual(regs.interrupt0(), 0)
       self.assertEqual(regs.interrupt1(), 0)
 
+   def testSnapshot(self):
+      driver = CountingDriver()
+      regs = FakeRegisterMap(driver)
+      with regs.snapshot():
+         self.assertEqual(regs.shouldBeZero(), 0)
+         self.assertEqual(regs.shouldBeOne(), 1)
+         self.assertEqual(regs.invertZero(), 1)
+         self.assertEqual(regs.invertOne(), 0)
+         self.assertEqual(driver.reads, 1)
+         driver.regmap[0x03] = 0
+         self.assertEqual(regs.shouldBeOne(), 1)
+      self.assertEqual(regs.shouldBeOne(), 0)
+      self.assertEqual(driver.reads, 2)
+
+   def testSnapshotWrite(self):
+      driver = CountingDriver()
+      regs = FakeRegisterMap(driver)
+      with regs.snapshot():
+         regs.bit3(1)
+         self.assertEqual(regs.scratchpad(), 0x8)
+         regs.scratchpad(0xf0)
+         self.assertEqual(regs.bit3(), 0)
+         self.assertEqual(driver.reads, 1)
+         self.assertEqual(driver.writes, 2)
+         regs.interrupt1(1)
+         self.assertEqual(regs.interrupt1(), 1)
+         regs.interrupt1(0)
+         self.assertEqual(regs.interrupt1(), 0)
+         self.assertEqual(driver.reads, 2)
+      self.assertEqual(driver.regmap[0x05], 0xf0)
+      self.assertEqual(driver.regmap[0x07], 0)
+
+   def testUpdate(self):
+      driver = CountingDriver()
+      regs = FakeRegisterMap(driver)
+      driver.regmap[0x05] = 0x1
+      regs.update(bit3=1)
+      self.assertEqual(driver.regmap[0x05], 0x9)
+      regs.update(bit3=0, scratchpad=0x0)
+      self.assertEqual(driver.regmap[0x05], 0x0)
+      with self.assertRaises(AssertionError):
+         regs.update(writeOk=1, failWrite=1)
+      with self.assertRaises(AttributeError):
+         regs.update(unknownField=1)
+
+   def testUpdateCoalesced(self):
+      class WideRegisterMap(RegisterMap):
+         CONTROL = Register(0x05,
+            RegBitField(0, 'ctrl0', ro=False),
+            RegBitField(1, 'ctrl1', ro=False, flip=True),
+            RegBitField(2, 'ctrl2', ro=False),
+         )
+         SET_CLEAR = SetClearRegister(0x07, 0x08,
+            RegBitField(0, name='interrupt0', ro=False),
+            RegBitField(1, name='interrupt1', ro=False),
+            RegBitField(2, name='interrupt2', ro=False),
+         )
+
+      driver = CountingDriver()
+      driver.regmap[0x05] = 0x4
+      driver.regmap[0x07] = 0x4
+      regs = WideRegisterMap(driver)
+      regs.update(ctrl0=1, ctrl1=0, ctrl2=0)
+      self.assertEqual(driver.regmap[0x05], 0x3)
+      self.assertEqual((driver.reads, driver.writes), (1, 1))
+      regs.update(interrupt0=1, interrupt1=1, interrupt2=0)
+      self.assertEqual(driver.regmap[0x07], 0x3)
+      self.assertEqual((driver.reads, driver.writes), (1, 3))
+
+   def testSnapshotClearOnRead(self):
+      driver = self.driver
+      regs = self.regs
+      driver.regmap[regs.CLEAR_ON_READ.addr] = 0x3
+      with regs.snapshot():
+         self.assertEqual(regs.clear0(), 1)
+         self.assertEqual(regs.clear0(), 0)
+         self.assertEqual(regs.clear1(), 1)
+         self.assertEqual(regs.clear1(), 0)
+
+   @patch('arista.drivers.scd.inSimulation', return_value=False)
+   def testSnapshotResetRegister(self, _):
+      class ResetRegisterMap(RegisterMap):
+         RESET = ScdResetRegister(0x07,
+            RegBitField(0, name='reset0', ro=False),
+            RegBitField(1, name='reset1', ro=False),
+            clearOffset=0x1,
+         )
+
+      driver = CountingDriver()
+      regs = ResetRegisterMap(driver)
+      with regs.snapshot():
+         self.assertEqual(regs.reset0(), 0)
+         regs.update(reset0=1, reset1=0)
+         self.assertEqual(regs.reset0(), 1)
+         self.assertEqual(regs.reset1(), 0)
+         regs.update(reset0=0, reset1=1)
+         self.assertEqual(regs.reset0(), 0)
+         self.assertEqual(regs.reset1(), 1)
+      self.assertEqual(driver.reads, 1)
+      self.assertEqual(driver.regmap[0x07], 0x2)
+
 if __name__ == '__main__':
    unittest.main()
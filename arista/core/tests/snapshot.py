@@ -0,0 +1,115 @@
+from __future__ import absolute_import, division, print_function
+
+import os
+import shutil
+import tempfile
+
+from ...tests.testing import unittest
+
+from ..component import Component
+from ..driver import Driver
+from ..snapshot import PlatformSnapshot
+
+class OffsetDriver(Driver):
+   '''Driver whose refresh looks up an offset in a fake kernel table'''
+   def __init__(self, kernel, name, **kwargs):
+      super(OffsetDriver, self).__init__(**kwargs)
+      self.kernel = kernel
+      self.name = name
+      self.offset = None
+      self.refreshes = 0
+
+   def refresh(self):
+      self.refreshes += 1
+      self.offset = self.kernel.get(self.name)
+
+   def snapshotState(self):
+      if self.offset is None:
+         return None
+      return {'offset': self.offset}
+
+   def restoreState(self, state):
+      if self.kernel.get(self.name) != state['offset']:
+         return False
+      self.offset = state['offset']
+      return True
+
+class FakePlatform(Component):
+   def __init__(self, kernel, **kwargs):
+      super(FakePlatform, self).__init__(**kwargs)
+      self.scds = []
+      for i in range(3):
+         child = self.newComponent(Component)
+         scd = OffsetDriver(kernel, 'scd%d' % i)
+         child.addDrivers([scd])
+         self.scds.append(scd)
+
+class PlatformSnapshotTest(unittest.TestCase):
+   def setUp(self):
+      self.tmpdir = tempfile.mkdtemp(prefix='unittest-arista-snapshot-')
+      self.bootIdPath = os.path.join(self.tmpdir, 'boot_id')
+      with open(self.bootIdPath, 'w') as f:
+         f.write('a\n')
+      self.path = os.path.join(self.tmpdir, 'snapshot.json')
+      self.kernel = {'scd0': 2, 'scd1': 10, 'scd2': 18}
+
+   def tearDown(self):
+      shutil.rmtree(self.tmpdir)
+
+   def newSnapshot(self):
+      return PlatformSnapshot(path=self.path, bootIdPath=self.bootIdPath)
+
+   def newPlatform(self):
+      platform = FakePlatform(self.kernel)
+      restored = self.newSnapshot().restore(platform)
+      return platform, restored
+
+   def testColdThenWarm(self):
+      platform, restored = self.newPlatform()
+      self.assertFalse(restored)
+      self.assertTrue(os.path.exists(self.path))
+      platform, restored = self.newPlatform()
+      self.assertTrue(restored)
+      self.assertEqual([scd.refreshes for scd in platform.scds], [0, 0, 0])
+      self.assertEqual([scd.offset for scd in platform.scds], [2, 10, 18])
+
+   def testStaleDriver(self):
+      self.newPlatform()
+      self.kernel['scd1'] = 26
+      platform, restored = self.newPlatform()
+      self.assertFalse(restored)
+      self.assertEqual([scd.refreshes for scd in platform.scds], [0, 1, 0])
+      self.assertEqual(platform.scds[1].offset, 26)
+      # the snapshot was updated with the new offset
+      self.assertTrue(self.newPlatform()[1])
+
+   def testBootIdChanged(self):
+      self.newPlatform()
+      with open(self.bootIdPath, 'w') as f:
+         f.write('b\n')
+      platform, restored = self.newPlatform()
+      self.assertFalse(restored)
+      self.assertEqual([scd.refreshes for scd in platform.scds], [1, 1, 1])
+
+   def testIncompleteState(self):
+      del self.kernel['scd2']
+      self.newPlatform()
+      platform, restored = self.newPlatform()
+      self.assertTrue(restored)
+      self.assertEqual([scd.refreshes for scd in platform.scds], [0, 0, 1])
+
+   def testDeferredChildren(self):
+      self.newPlatform()
+      platform = FakePlatform(self.kernel)
+      platform.defer(lambda: platform.newComponent(Component))
+      self.assertTrue(self.newSnapshot().restore(platform))
+      self.assertEqual(len(platform.pending_), 1)
+
+   def testClear(self):
+      self.newPlatform()
+      self.newSnapshot().clear()
+      self.assertFalse(os.path.exists(self.path))
+      self.assertFalse(self.newPlatform()[1])
+
+if __name__ == '__main__':
+   unittest.main()
@@ -0,0 +1,195 @@
+from __future__ import absolute_import, division, print_function
+
+import os
+import shutil
+import struct
+import tempfile
+import threading
+import time
+
+from ...tests.testing import unittest, patch
+from ...libs.fs import rmfile, touch
+
+from ..utils import FileWaiter, HwmonIndex, MmapResource
+
+class MmapResourceTest(unittest.TestCase):
+   WORDS = 64
+
+   def setUp(self):
+      fd, self.path = tempfile.mkstemp(prefix='unittest-arista-mmap-')
+      os.write(fd, struct.pack('<%dL' % self.WORDS,
+                               *[0x1000 + i for i in range(self.WORDS)]))
+      os.close(fd)
+      self.resource = MmapResource(self.path)
+      self.assertTrue(self.resource.map())
+
+   def tearDown(self):
+      self.resource.close()
+      rmfile(self.path)
+
+   def testReadWrite32(self):
+      self.assertEqual(self.resource.read32(0x10), 0x1004)
+      self.resource.write32(0x10, 0xdeadbeef)
+      self.assertEqual(self.resource.read32(0x10), 0xdeadbeef)
+
+   def testWordAccess32(self):
+      words = self.resource.wordView()
+      if words is None:
+         self.skipTest('no word view on this platform')
+      self.resource.write32(0x8, 0xcafe)
+      self.assertEqual(words[0x2], 0xcafe)
+      # unaligned accesses go through the mapping
+      self.assertEqual(self.resource.read32(0x2), 0x10010000)
+
+   def testReadBlock32(self):
+      words = self.resource.readBlock32(0x20, 4)
+      self.assertEqual(list(words), [0x1008, 0x1009, 0x100a, 0x100b])
+
+   def testReadStrided32(self):
+      words = self.resource.readStrided32(0x0, 3, 0x10)
+      self.assertEqual(list(words), [0x1000, 0x1004, 0x1008])
+
+   def testStridedAccesses(self):
+      reads = []
+      read32 = self.resource.read32
+      def recordRead32(addr):
+         reads.append(addr)
+         return read32(addr)
+      with patch.object(self.resource, 'wordView', return_value=None), \
+           patch.object(self.resource, 'read32', recordRead32):
+         words = self.resource.readStrided32(0x4, 3, 0x10)
+      self.assertEqual(words, [0x1001, 0x1005, 0x1009])
+      # the registers in between are never read
+      self.assertEqual(reads, [0x4, 0x14, 0x24])
+
+   def testWriteBlock32(self):
+      self.resource.writeBlock32(0x8, [0xffffffff, 0, 42])
+      self.assertEqual(list(self.resource.readBlock32(0x4, 5)),
+                       [0x1001, 0xffffffff, 0, 42, 0x1005])
+
+class FileWaiterTest(unittest.TestCase):
+   def setUp(self):
+      self.path = tempfile.mkdtemp(prefix='unittest-arista-waiter-')
+
+   def tearDown(self):
+      shutil.rmtree(self.path)
+
+   def _createLater(self, delay, *parts):
+      def create():
+         time.sleep(delay)
+         path = self.path
+         for part in parts[:-1]:
+            path = os.path.join(path, part)
+            os.mkdir(path)
+         touch(os.path.join(path, parts[-1]))
+      thread = threading.Thread(target=create)
+      thread.start()
+      self.addCleanup(thread.join)
+
+   def _wait(self, waitFile, timeout=5):
+      start = time.time()
+      result = FileWaiter(waitFile, timeout).waitFileReady()
+      return result, time.time() - start
+
+   def testExisting(self):
+      touch(os.path.join(self.path, 'file'))
+      result, elapsed = self._wait(os.path.join(self.path, 'file'))
+      self.assertTrue(result)
+      self.assertLess(elapsed, 0.04)
+
+   @patch.object(FileWaiter, 'POLL_DELAY', 10)
+   def testInotifyWakeup(self):
+      self._createLater(0.1, 'file')
+      result, elapsed = self._wait(os.path.join(self.path, 'file'))
+      self.assertTrue(result)
+      self.assertLess(elapsed, 1)
+
+   @patch.object(FileWaiter, 'POLL_DELAY', 10)
+   def testInotifyPattern(self):
+      self._createLater(0.1, 'hwmon', 'hwmon3')
+      result, elapsed = self._wait((self.path, 'hwmon', r'hwmon\d'))
+      self.assertTrue(result)
+      self.assertLess(elapsed, 1)
+
+   @patch.object(FileWaiter, '_openInotify', lambda self: None)
+   def testPollingFallback(self):
+      self._createLater(0.1, 'dir', 'file')
+      result, _ = self._wait(os.path.join(self.path, 'dir', 'file'))
+      self.assertTrue(result)
+
+   def testTimeout(self):
+      result, elapsed = self._wait(os.path.join(self.path, 'missing'), 0.2)
+      self.assertFalse(result)
+      self.assertGreaterEqual(elapsed, 0.2)
+
+class HwmonIndexTest(unittest.TestCase):
+   def setUp(self):
+      self.tmpdir = tempfile.mkdtemp(prefix='unittest-arista-hwmon-')
+      self.device = os.path.join(self.tmpdir, 'device')
+      self.hwmon = os.path.join(self.device, 'hwmon', 'hwmon3')
+      os.makedirs(self.hwmon)
+      touch(os.path.join(self.hwmon, 'temp1_input'))
+      self.bootIdPath = os.path.join(self.tmpdir, 'boot_id')
+      self.setBootId('a')
+      self.indexPath = os.path.join(self.tmpdir, 'index.json')
+
+   def tearDown(self):
+      shutil.rmtree(self.tmpdir)
+
+   def setBootId(self, bootId):
+      with open(self.bootIdPath, 'w') as f:
+         f.write('%s\n' % bootId)
+
+   def newIndex(self):
+      return HwmonIndex(path=self.indexPath, bootIdPath=self.bootIdPath)
+
+   def testLocate(self):
+      self.assertEqual(self.newIndex().locate(self.device, 'temp'), self.hwmon)
+      self.assertTrue(os.path.exists(self.indexPath))
+      self.assertIsNone(self.newIndex().locate(self.tmpdir, 'temp'))
+
+   def testPersisted(self):
+      self.newIndex().locate(self.device, 'temp')
+      with patch('os.walk', side_effect=AssertionError('walked')):
+         self.assertEqual(self.newIndex().locate(self.device, 'temp'),
+                          self.hwmon)
+
+   def testBootIdChanged(self):
+      self.newIndex().locate(self.device, 'temp')
+      self.setBootId('b')
+      with patch('os.walk', return_value=iter([])) as walk:
+         self.assertIsNone(self.newIndex().locate(self.device, 'temp'))
+         self.assertTrue(walk.called)
+
+   def testStaleEntry(self):
+      self.newIndex().locate(self.device, 'temp')
+      other = os.path.join(self.device, 'hwmon', 'hwmon4')
+      os.rename(self.hwmon, other)
+      self.assertEqual(self.newIndex().locate(self.device, 'temp'), other)
+
+   def testConcurrentProcesses(self):
+      other = os.path.join(self.tmpdir, 'other')
+      otherHwmon = os.path.join(other, 'hwmon', 'hwmon5')
+      os.makedirs(otherHwmon)
+      touch(os.path.join(otherHwmon, 'temp1_input'))
+      first = self.newIndex()
+      second = self.newIndex()
+      first.load()
+      second.load()
+      first.locate(self.device, 'temp')
+      second.locate(other, 'temp')
+      # the second process merged the entry stored by the first one
+      with patch('os.walk', side_effect=AssertionError('walked')):
+         index = self.newIndex()
+         self.assertEqual(index.locate(self.device, 'temp'), self.hwmon)
+         self.assertEqual(index.locate(other, 'temp'), otherHwmon)
+      self.assertEqual(sorted(os.listdir(self.tmpdir)),
+                       ['boot_id', 'device', 'index.json', 'other'])
+
+   def testCorruptedIndex(self):
+      with open(self.indexPath, 'w') as f:
+         f.write('{')
+      self.assertEqual(self.newIndex().locate(self.device, 'temp'), self.hwmon)
+
+if __name__ == '__main__':
+   unittest.main()
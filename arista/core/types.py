@@ -10,10 +10,14 @@ Gpio = namedtuple("Gpio", ["bit", "ro", "activeLow"])
 ResetGpio = namedtuple("ResetGpio", ["addr", "bit", "activeLow", "name"])
 
 class SysfsPath(object):
+   __slots__ = ()
+
    def getSysfsPath(self):
       raise NotImplementedError
 
 class I2cAddr(SysfsPath):
+   __slots__ = ('bus_', 'address_')
+
    def __init__(self, bus, address):
       self.bus_ = bus
       self.address_ = address
@@ -3,6 +3,8 @@ import json
 import mmap
 import os
 import re
+import sys
+import tempfile
 import time
 
 from datetime import datetime
@@ -10,6 +12,8 @@ from functools import wraps
 from struct import pack, unpack
 
 from .log import getLogger
+from ..libs.benchmark import traced
+from ..libs.inotify import Inotify
 from ..libs.python import isinteger
 
 logging = getLogger(__name__)
@@ -17,6 +21,8 @@ logging = getLogger(__name__)
 FLASH_MOUNT = '/host'
 TMPFS_MOUNT = '/run'
 
+monotonic = getattr(time, 'monotonic', time.time)
+
 class HwApi(object):
    def __init__(self, *values):
       self.values = [int(v) for v in values]
@@ -50,6 +56,7 @@ class MmapResource(object):
    def __init__(self, path):
       self.path_ = path
       self.mmap_ = None
+      self.words_ = None
 
    def __enter__(self):
       if not self.map():
@@ -94,14 +101,63 @@ class MmapResource(object):
       return True
 
    def close( self ):
+      if self.words_ is not None:
+         # the mapping cannot be closed while a view is exported
+         self.words_.release()
+         self.words_ = None
       self.mmap_.close()
       self.mmap_ = None
 
+   def wordView( self ):
+      """Return a zero-copy view of the mapping indexed by 32-bit word.
+
+      None is returned when the view cannot match the little endian layout of
+      the registers or when memoryview.cast is not available.
+      """
+      if self.words_ is None and sys.byteorder == 'little' and \
+         hasattr( memoryview, 'cast' ):
+         try:
+            self.words_ = memoryview( self.mmap_ ).cast( 'I' )
+         except TypeError:
+            logging.debug( "cannot create a word view of %s", self.path_ )
+      return self.words_
+
+   # Registers are accessed as one aligned 32-bit word, struct.unpack_from and
+   # pack_into on the mapping may go byte by byte which splits the access of
+   # clear-on-read or write-triggered registers.
    def read32( self, addr ):
+      words = self.wordView()
+      if words is not None and not addr % 4:
+         return words[ addr // 4 ]
       return unpack( '<L', self.mmap_[ addr : addr + 4 ] )[ 0 ]
 
    def write32( self, addr, value ):
-      self.mmap_[ addr: addr + 4 ] = pack( '<L', value )
+      words = self.wordView()
+      if words is not None and not addr % 4:
+         words[ addr // 4 ] = value
+      else:
+         self.mmap_[ addr : addr + 4 ] = pack( '<L', value )
+
+   # blocks go through the same word accesses, a copy of the span would also
+   # read the registers in between the requested ones
+   def readBlock32( self, addr, count ):
+      """Read count consecutive 32-bit words starting at addr."""
+      return self.readStrided32( addr, count, 4 )
+
+   def readStrided32( self, addr, count, stride ):
+      """Read count 32-bit words spaced by stride bytes, e.g. a register bank."""
+      assert stride > 0 and stride % 4 == 0, "stride must be a multiple of 4"
+      words = self.wordView()
+      if words is not None and not addr % 4:
+         start = addr // 4
+         step = stride // 4
+         return words[ start : start + count * step : step ].tolist()
+      return [ self.read32( addr + i * stride ) for i in range( count ) ]
+
+   def writeBlock32( self, addr, values ):
+      """Write consecutive 32-bit words starting at addr."""
+      for i, value in enumerate( values ):
+         self.write32( addr + i * 4, value )
 
 def sysfsFmtHex(x):
    return "0x%08x" % x
@@ -163,6 +219,15 @@ WAITFILE_HWMON = 'hwmon'
 # Depreciate this object if we want to wait on access instead of waiting at start
 # and potentially failing
 class FileWaiter(object):
+   '''Wait for a file, or a path made of regex patterns, to appear
+
+   The deepest existing directory on the way to the file is watched with
+   inotify so that the wait ends as soon as the file is created. Some sysfs
+   nodes are created without emitting any event so the file is also polled
+   every POLL_DELAY seconds.
+   '''
+   POLL_DELAY = 0.05
+
    def __init__(self, waitFile=None, waitTimeout=None):
       self.waitFile = waitFile
       self.waitTimeout = float(waitTimeout) if waitTimeout else 1.0
@@ -171,14 +236,64 @@ class FileWaiter(object):
       if not self.waitFile:
          return False
 
+      with traced(str(self.waitFile), 'wait'):
+         return self._waitFileReady()
+
+   def _watchDir(self):
+      if isinstance(self.waitFile, str):
+         path = os.path.dirname(self.waitFile)
+      else:
+         path = self.waitFile[0]
+         for pattern in self.waitFile[1:-1]:
+            if not os.path.isdir(path):
+               break
+            subdirs = [f for f in os.listdir(path) if re.match(pattern, f)]
+            if not subdirs:
+               break
+            path = os.path.join(path, subdirs[0])
+      while path and not os.path.isdir(path):
+         path = os.path.dirname(path)
+      return path
+
+   def _openInotify(self):
+      try:
+         return Inotify()
+      except (OSError, AttributeError) as e:
+         logging.debug('inotify unavailable, polling %s: %s', self.waitFile, e)
+         return None
+
+   def _waitFileReady(self):
+      if self.fileExists():
+         return True
+
       logging.debug('Waiting file %s.', self.waitFile)
 
-      for r in Retrying(interval=self.waitTimeout):
-         if self.fileExists():
-            return True
-         logging.debug('Waiting file %s attempt %d.', self.waitFile, r.attempt)
+      deadline = monotonic() + self.waitTimeout
+      inotify = self._openInotify()
+      try:
+         while True:
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+               break
+            delay = min(self.POLL_DELAY, remaining)
+            if inotify is not None:
+               try:
+                  inotify.addWatch(self._watchDir())
+               except OSError:
+                  pass
+               # the file may have been created before the watch was added
+               if self.fileExists():
+                  return True
+               inotify.wait(delay)
+            else:
+               time.sleep(delay)
+            if self.fileExists():
+               return True
+      finally:
+         if inotify is not None:
+            inotify.close()
 
-      if not os.path.exists(self.waitFile):
+      if not self.fileExists():
          logging.error('Waiting file %s failed.', self.waitFile)
          return False
       return True
@@ -273,6 +388,25 @@ class StoredData(object):
       with open(self.path, mode) as tmpFile:
          tmpFile.write(data)
 
+   def replace(self, data):
+      '''Write data to a temporary file renamed over the current one
+
+      Readers see either the previous or the new content, never a partial one.
+      '''
+      dirname = os.path.dirname(self.path)
+      assert os.path.isdir(dirname), \
+            'Base directory for %s file %s not found!' % (self.lifespan, self.name)
+      fd, tmpPath = tempfile.mkstemp(prefix='.%s.' % self.name, dir=dirname)
+      try:
+         # mkstemp creates the file readable by its owner only
+         os.fchmod(fd, 0o644)
+         with os.fdopen(fd, 'w') as tmpFile:
+            tmpFile.write(data)
+         os.rename(tmpPath, self.path)
+      except:
+         os.remove(tmpPath)
+         raise
+
    def read(self):
       assert os.path.isfile(self.path), \
             'File %s of type %s not found!' % (self.name, self.lifespan)
@@ -297,6 +431,10 @@ class JsonStoredData(StoredData):
       super(JsonStoredData, self).write(json.dumps(data, indent=3,
                                                    separators=(',', ': ')), mode)
 
+   def replace(self, data):
+      super(JsonStoredData, self).replace(json.dumps(data, indent=3,
+                                                     separators=(',', ': ')))
+
    def read(self):
       res = super(JsonStoredData, self).read()
       if res:
@@ -378,19 +516,95 @@ def writeConfig(path, data):
       except IOError as e:
          logging.error('%s %s', path, e.strerror)
 
-# Hwmon directories that need to be navigated
-# Keeps trying to get path to show up, or search in searchPath
-def locateHwmonPath(searchPath, prefix):
+BOOT_ID_PATH = '/proc/sys/kernel/random/boot_id'
+HWMON_INDEX_FILE = 'arista-hwmon-index.json'
+
+def getBootId(path=BOOT_ID_PATH):
+   try:
+      with open(path) as f:
+         return f.read().strip()
+   except IOError:
+      return None
+
+def walkHwmonPath(searchPath, prefix):
    for root, _, files in os.walk(os.path.join(searchPath, 'hwmon')):
       for name in files:
          if name.startswith(prefix):
-            path = root
-            logging.debug('got hwmon path for %s as %s', searchPath,
-                          path)
+            return root
+   return None
+
+class HwmonIndex(object):
+   '''Hwmon directory of each device sysfs path, shared by all processes
+
+   The index is stored under /run along with the boot id of the kernel that
+   created the hwmon directories and is discarded when the boot id changes.
+   Entries are checked with a single stat before being used and looked up
+   again with a directory walk when stale.
+   New entries are merged with the ones stored by other processes meanwhile,
+   an entry lost to a concurrent update is only walked for again.
+   '''
+   def __init__(self, path=None, bootIdPath=BOOT_ID_PATH):
+      self.data = JsonStoredData(HWMON_INDEX_FILE, path=path)
+      self.bootIdPath = bootIdPath
+      self.bootId = None
+      self.entries = None
+
+   def read(self):
+      '''Entries currently stored for this boot'''
+      if self.bootId is None or not self.data.exist():
+         return {}
+      try:
+         data = self.data.read()
+      except (IOError, ValueError) as e:
+         logging.debug('ignoring hwmon index %s: %s', self.data.path, e)
+         return {}
+      if isinstance(data, dict) and data.get('bootId') == self.bootId:
+         return data.get('entries', {})
+      return {}
+
+   def load(self):
+      self.bootId = getBootId(self.bootIdPath)
+      self.entries = self.read()
+
+   def store(self, updates):
+      if self.bootId is None:
+         return
+      entries = self.read()
+      entries.update(updates)
+      self.entries.update(entries)
+      try:
+         self.data.replace({'bootId': self.bootId, 'entries': entries})
+      except (IOError, OSError, AssertionError) as e:
+         logging.debug('failed to store hwmon index %s: %s', self.data.path, e)
+
+   def locate(self, searchPath, prefix):
+      if self.entries is None:
+         self.load()
+      path = self.entries.get(searchPath)
+      if path is not None:
+         try:
+            os.stat(path)
             return path
+         except OSError:
+            logging.debug('stale hwmon path %s for %s', path, searchPath)
+      path = walkHwmonPath(searchPath, prefix)
+      if path is None:
+         return None
+      self.entries[searchPath] = path
+      self.store({searchPath: path})
+      return path
 
-   logging.error('could not locate hwmon path for %s', searchPath)
-   return None
+hwmonIndex = HwmonIndex()
+
+# Hwmon directories that need to be navigated
+# Keeps trying to get path to show up, or search in searchPath
+def locateHwmonPath(searchPath, prefix):
+   path = hwmonIndex.locate(searchPath, prefix)
+   if path is None:
+      logging.error('could not locate hwmon path for %s', searchPath)
+      return None
+   logging.debug('got hwmon path for %s as %s', searchPath, path)
+   return path
 
 def libraryInit():
    global simulation, debug, SMBus
@@ -19,9 +19,8 @@ class SeuDaemonFeature(PollDaemonFeature):
    def init(self):
       PollDaemonFeature.init(self)
       self.seuErrorDetected = False
-      if self.daemon.platform.syscpld.powerCycleOnSeu():
-         logging.info('disabling powercycle on SEU')
-         self.daemon.platform.syscpld.powerCycleOnSeu(False)
+      if self.daemon.platform.syscpld.disablePowerCycleOnSeu():
+         logging.info('disabled powercycle on SEU')
       else:
          logging.info('powercycle on SEU already disabled')
 
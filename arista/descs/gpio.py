@@ -4,6 +4,8 @@ from __future__ import absolute_import, division, print_function
 from ..core.desc import HwDesc
 
 class GpioDesc(HwDesc):
+   __slots__ = ('name', 'addr', 'bit', 'ro', 'activeLow')
+
    def __init__(self, name, addr, bit, ro=False, activeLow=False, **kwargs):
       super(GpioDesc, self).__init__(**kwargs)
 
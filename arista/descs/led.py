@@ -4,6 +4,8 @@ from __future__ import absolute_import, division, print_function
 from ..core.desc import HwDesc
 
 class LedDesc(HwDesc):
+   __slots__ = ('name', 'colors')
+
    def __init__(self, name=None, colors=None, **kwargs):
       super(LedDesc, self).__init__(**kwargs)
       self.name = name
@@ -9,6 +9,9 @@ class Position(object):
    OTHER = 'other'
 
 class SensorDesc(HwDesc):
+   __slots__ = ('diode', 'name', 'position', 'target', 'overheat',
+                'critical')
+
    def __init__(self, diode, name, position, target, overheat, critical, **kwargs):
       super(SensorDesc, self).__init__(**kwargs)
       self.diode = diode
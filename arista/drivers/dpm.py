@@ -1,29 +1,52 @@
+from ..core.component import Priority
 from ..core.driver import Driver
 from ..core.i2c_utils import I2cMsg
-from ..core.utils import inSimulation, SMBus
+from ..core.utils import inSimulation
 from ..core.log import getLogger
 
+from .i2c import i2cBusPool
+
 logging = getLogger(__name__)
 
 SMBUS_BLOCK_MAX_SZ = 32
 
 class UcdI2cDevDriver(Driver):
-   def __init__(self, registers=None, addr=None, **kwargs):
+   def __init__(self, registers=None, addr=None, priority=Priority.BACKGROUND,
+                **kwargs):
       self.bus = None
+      self.priority = priority
       self.busMsg = I2cMsg(addr)
+      self.handle_ = None
       self.registers = registers
       self.addr = addr
       super(UcdI2cDevDriver, self).__init__(**kwargs)
 
    def __enter__(self):
-      self.bus = SMBus(self.addr.bus)
-      if not inSimulation():
-         self.busMsg.open()
+      # keep a reference on the bus for the lifetime of the driver and own it
+      # for the whole sequence of transactions
+      if self.handle_ is None:
+         self.handle_ = i2cBusPool.acquire(self.addr.bus)
+      scheduler = self.handle_.scheduler
+      scheduler.acquire(priority=self.priority, device=self.addr.address)
+      try:
+         self.bus = self.handle_.smbus
+         if not inSimulation():
+            self.busMsg.attach(self.handle_.device)
+      except:
+         scheduler.release()
+         raise
       return self
 
    def __exit__(self, *args):
       self.busMsg.close()
-      self.bus.close()
+      self.bus = None
+      self.handle_.scheduler.release()
+
+   def clean(self):
+      if self.handle_ is not None:
+         i2cBusPool.release(self.handle_)
+         self.handle_ = None
+      super(UcdI2cDevDriver, self).clean()
 
    def dumpReg(self, name, data):
       logging.debug('%s reg: %s', name, ' '.join('%02x' % s for s in data))
@@ -33,15 +56,26 @@ class UcdI2cDevDriver(Driver):
       data = self.busMsg.getI2cBlock(self.addr.address, reg, size)
       return data[1:data[0]+1]
 
+   def getBlocks(self, regs):
+      '''Read several block registers, batched as far as the adapter allows'''
+      transaction = self.busMsg.transaction()
+      for reg in regs:
+         transaction.read(self.addr.address, reg, 1)
+      sizes = self.busMsg.execute(transaction)
+      transaction = self.busMsg.transaction()
+      for reg, size in zip(regs, sizes):
+         transaction.read(self.addr.address, reg, size[0] + 1)
+      return [data[1:data[0]+1] for data in self.busMsg.execute(transaction)]
+
    def setBlock(self, reg, data):
       self.busMsg.setI2cBlock(self.addr.address, reg, [ len(data) ] + data)
 
    def getVersion(self):
       if inSimulation():
          return "SERIAL UCDSIM 2.3.4.0005 241218"
-      data = self.getBlock(self.registers.MFR_SERIAL)
-      serial = ''.join(chr(c) for c in data)
-      data = self.getBlock(self.registers.DEVICE_ID)
+      serial, data = self.getBlocks([self.registers.MFR_SERIAL,
+                                     self.registers.DEVICE_ID])
+      serial = ''.join(chr(c) for c in serial)
       devid = ''.join(chr(c) for c in data if c).replace('|', ' ')
       return '%s %s' % (serial, devid)
 
@@ -1,41 +1,46 @@
-from contextlib import closing
-
-from ..core.driver import Driver
 from ..core import utils
 from ..core.log import getLogger
 
+from .i2c import I2cBusDriver
+
 logging = getLogger(__name__)
 
-class Ds460I2cDriver(Driver):
+class Ds460I2cDriver(I2cBusDriver):
    def __init__(self, name=None, addr=None, **kwargs):
       self.name = name
-      self.addr = addr
-      super(Ds460I2cDriver, self).__init__(*kwargs)
+      super(Ds460I2cDriver, self).__init__(addr=addr, **kwargs)
 
    def setup(self):
       addr = self.addr.address
 
       logging.debug('%s: initializing registers', self.name)
-      with closing(utils.SMBus(self.addr.bus)) as bus:
-         for _ in utils.Retrying(interval=10.0, delay=0.5):
-            try:
-               bus.read_byte_data(addr, 0x00)
-               logging.debug('%s: device accessible: bus=%s',
-                             self.name, self.addr.bus)
-               break
-            except IOError:
-               logging.debug('%s: device not accessible; retrying...', self.name)
-         else:
-            logging.error('%s: failed to access device: bus=%s',
+      # the bus is only held for each access, not while waiting for the device
+      for _ in utils.Retrying(interval=10.0, delay=0.5):
+         try:
+            with self.request():
+               self.bus.read_byte_data(addr, 0x00)
+            logging.debug('%s: device accessible: bus=%s',
                           self.name, self.addr.bus)
-            return
+            break
+         except IOError:
+            logging.debug('%s: device not accessible; retrying...', self.name)
+      else:
+         logging.error('%s: failed to access device: bus=%s',
+                       self.name, self.addr.bus)
+         self.close()
+         return
 
-         try:
+      try:
+         with self.request():
+            bus = self.bus
             byte = bus.read_byte_data(addr, 0x10)
             bus.write_byte_data(addr, 0x10, 0)
             bus.write_byte_data(addr, 0x03, 1)
             bus.write_byte_data(addr, 0x10, byte)
-         except IOError:
-            logging.debug('%s: failed to initialize', self.name)
+      except IOError:
+         logging.debug('%s: failed to initialize', self.name)
+      finally:
+         # only used during setup, no need to keep the bus open
+         self.close()
 
       super(Ds460I2cDriver, self).setup()
@@ -1,11 +1,9 @@
 
-from contextlib import closing
 import os
 
-from ..core.driver import Driver
-from ..core.utils import SMBus
+from ..core.component import Priority
 
-from .i2c import I2cKernelDriver
+from .i2c import I2cBusDriver, I2cKernelDriver
 
 class EepromKernelDriver(I2cKernelDriver):
    def __init__(self, name='eeprom', module='eeprom', **kwargs):
@@ -16,18 +14,19 @@ class EepromKernelDriver(I2cKernelDriver):
       with open(path) as f:
          return f.read()
 
-class SeepromI2cDevDriver(Driver):
+class SeepromI2cDevDriver(I2cBusDriver):
 
    offset = 0
    length = 256
    header_size = 8
 
-   def __init__(self, addr=None, **kwargs):
-      super(SeepromI2cDevDriver, self).__init__(**kwargs)
-      self.addr = addr
+   def __init__(self, addr=None, priority=Priority.BACKGROUND, **kwargs):
+      super(SeepromI2cDevDriver, self).__init__(addr=addr, priority=priority,
+                                                **kwargs)
 
    def read(self):
-      with closing(SMBus(self.addr.bus)) as bus:
+      with self.request():
+         bus = self.bus
          data = ''
          bus.write_byte_data(self.addr.address, 0x00, 0)
 
@@ -1,17 +1,231 @@
 import os
+import threading
 
-from contextlib import closing
+from contextlib import contextmanager
 
-from .sysfs import FanSysfsDriver
+from .sysfs import FanSysfsDriver, SysfsFdCache
 
+from ..core.component import Priority
 from ..core.driver import Driver, KernelDriver
 from ..core import utils
 from ..core.log import getLogger
-from ..core.utils import SMBus
 
 logging = getLogger(__name__)
 
+class I2cBusRequest(object):
+   def __init__(self, owner, priority, device, deadline, seq):
+      self.owner = owner
+      self.priority = priority
+      self.device = device
+      self.deadline = deadline
+      self.seq = seq
+
+class I2cBusScheduler(object):
+   '''Grants the use of a bus to one request at a time
+
+   When the bus is released the next owner is picked among the waiting
+   requests: the ones past their deadline first, then by priority class
+   (thermal, default and background) and finally the device served the longest time ago so that a device doing
+   bursts of transactions cannot starve its neighbours.
+   The owner of the bus can acquire it again without blocking.
+
+   The scheduling only applies to the threads of the current process, other
+   processes accessing the same bus (e.g. other daemons) are not ordered by
+   it and still contend with it at the adapter level.
+   '''
+   DEFAULT_DEADLINES = {
+      Priority.THERMAL: 0.1,
+      Priority.DEFAULT: 1.0,
+      Priority.BACKGROUND: 2.0,
+   }
+
+   def __init__(self):
+      self.cond = threading.Condition(threading.Lock())
+      self.owner = None
+      self.depth = 0
+      self.waiting = []
+      self.served = {}
+      self.seq = 0
+
+   def _key(self, request, now):
+      late = request.deadline <= now
+      return (not late, request.deadline if late else 0, request.priority,
+              self.served.get(request.device, -1), request.seq)
+
+   def _next(self):
+      now = utils.monotonic()
+      return min(self.waiting, key=lambda request: self._key(request, now))
+
+   def _grant(self, owner, device):
+      self.owner = owner
+      self.depth = 1
+      self.seq += 1
+      self.served[device] = self.seq
+
+   def acquire(self, priority=Priority.DEFAULT, device=None, deadline=None):
+      '''Block until the bus is granted, deadline is relative in seconds'''
+      owner = threading.current_thread()
+      with self.cond:
+         if self.owner is owner:
+            self.depth += 1
+            return
+         if self.owner is None and not self.waiting:
+            self._grant(owner, device)
+            return
+         if deadline is None:
+            deadline = self.DEFAULT_DEADLINES.get(priority, 1.0)
+         self.seq += 1
+         request = I2cBusRequest(owner, priority, device,
+                                 utils.monotonic() + deadline, self.seq)
+         self.waiting.append(request)
+         try:
+            while self.owner is not None or self._next() is not request:
+               self.cond.wait()
+         except BaseException:
+            # the request may have been the next one, let the others re-elect
+            self.waiting.remove(request)
+            if self.owner is None and self.waiting:
+               self.cond.notify_all()
+            raise
+         self.waiting.remove(request)
+         self._grant(owner, device)
+
+   def release(self):
+      with self.cond:
+         assert self.owner is threading.current_thread()
+         self.depth -= 1
+         if self.depth:
+            return
+         self.owner = None
+         if self.waiting:
+            self.cond.notify_all()
+
+   @contextmanager
+   def request(self, priority=Priority.DEFAULT, device=None, deadline=None):
+      self.acquire(priority=priority, device=device, deadline=deadline)
+      try:
+         yield
+      finally:
+         self.release()
+
+   def __enter__(self):
+      self.acquire()
+      return self
+
+   def __exit__(self, *args):
+      self.release()
+
+class I2cBusHandle(object):
+   '''Process wide handle on an i2c bus shared by every driver using it
+
+   The scheduler must be held while issuing transactions so that concurrent
+   users of the bus are serialized.
+   '''
+   def __init__(self, bus):
+      self.bus = bus
+      self.refs = 0
+      self.scheduler = I2cBusScheduler()
+      self.smbus_ = None
+      self.device_ = None
+
+   def __str__(self):
+      return '%s(bus=%d, refs=%d)' % (self.__class__.__name__, self.bus, self.refs)
+
+   @property
+   def smbus(self):
+      if self.smbus_ is None:
+         self.smbus_ = utils.SMBus(self.bus)
+      return self.smbus_
+
+   @property
+   def device(self):
+      '''Raw /dev/i2c-N file used for I2C_RDWR transactions'''
+      if self.device_ is None:
+         self.device_ = open('/dev/i2c-%d' % self.bus, 'r+b', buffering=0)
+      return self.device_
+
+   def close(self):
+      if self.smbus_ is not None:
+         self.smbus_.close()
+         self.smbus_ = None
+      if self.device_ is not None:
+         self.device_.close()
+         self.device_ = None
+
+class I2cBusPool(object):
+   '''Reference counted I2cBusHandle objects keyed by bus number'''
+   def __init__(self):
+      self.handles = {}
+      self.lock = threading.Lock()
+
+   def acquire(self, bus):
+      with self.lock:
+         handle = self.handles.get(bus)
+         if handle is None:
+            handle = I2cBusHandle(bus)
+            self.handles[bus] = handle
+         handle.refs += 1
+         return handle
+
+   def release(self, handle):
+      with self.lock:
+         handle.refs -= 1
+         if handle.refs > 0:
+            return
+         if self.handles.get(handle.bus) is handle:
+            del self.handles[handle.bus]
+      with handle.scheduler:
+         handle.close()
+
+   @contextmanager
+   def lease(self, bus, priority=Priority.DEFAULT, device=None, deadline=None):
+      '''Exclusive use of a bus for a sequence of transactions'''
+      handle = self.acquire(bus)
+      try:
+         with handle.scheduler.request(priority, device, deadline):
+            yield handle
+      finally:
+         self.release(handle)
+
+i2cBusPool = I2cBusPool()
+
+class I2cBusDriver(Driver):
+   '''Driver keeping a reference on its bus from the first access until clean
+
+   Holding the reference keeps the pooled handle and its files open so that
+   periodic accesses don't reopen /dev/i2c-N every time.
+   '''
+   def __init__(self, addr=None, priority=Priority.DEFAULT, **kwargs):
+      super(I2cBusDriver, self).__init__(**kwargs)
+      self.handle_ = None
+      self.addr = addr
+      self.priority = priority
+
+   @property
+   def handle(self):
+      if self.handle_ is None:
+         self.handle_ = i2cBusPool.acquire(self.addr.bus)
+      return self.handle_
+
+   @property
+   def bus(self):
+      return self.handle.smbus
+
+   def close(self):
+      if self.handle_ is not None:
+         i2cBusPool.release(self.handle_)
+         self.handle_ = None
+
+   def clean(self):
+      self.close()
+      super(I2cBusDriver, self).clean()
+
+   def request(self):
+      return self.handle.scheduler.request(self.priority, self.addr.address)
+
 class I2cKernelDriver(Driver):
+   SERIAL_SETUP = True
+
    def __init__(self, name=None, addr=None, waitFile=None, waitTimeout=None,
                 module=None, **kwargs):
       self.name = name
@@ -60,6 +274,8 @@ class I2cKernelDriver(Driver):
          logging.debug('removing i2c device %s from bus %d', self.name, addr.bus)
          with open(path, 'w') as f:
             f.write('0x%02x' % addr.address)
+      # drop any descriptor still pointing at the attributes of the device
+      SysfsFdCache.invalidateAll(self.getSysfsPath())
       if self.kernelDriver:
          self.kernelDriver.clean()
       super(I2cKernelDriver, self).clean()
@@ -103,40 +319,36 @@ class I2cKernelFanDriver(I2cKernelDriver):
    def getFanDirection(self, fan):
       return self.sysfsDriver.getFanDirection(fan)
 
-class I2cDevDriver(Driver):
-   def __init__(self, name=None, addr=None, registerCls=None, **kwargs):
-      super(I2cDevDriver, self).__init__(*kwargs)
-      self.bus_ = None
+   def snapshotFans(self, fans):
+      return self.sysfsDriver.snapshotFans(fans)
+
+   def getFanPresences(self, fans):
+      return self.sysfsDriver.getFanPresences(fans)
+
+class I2cDevDriver(I2cBusDriver):
+   def __init__(self, name=None, addr=None, registerCls=None,
+                priority=Priority.DEFAULT, **kwargs):
+      super(I2cDevDriver, self).__init__(addr=addr, priority=priority, **kwargs)
       self.name = name
-      self.addr = addr
       self.regs = registerCls(self) if registerCls is not None else None
       # TODO:
       # introduce callback table based on value types used.
 
-   @property
-   def bus(self):
-      if self.bus_ is None:
-         self.bus_ = utils.SMBus(self.addr.bus)
-      return self.bus_
-
-   def close(self):
-      if self.bus_ is not None:
-         self.bus_.close()
-         self.bus_ = None
-
    def smbusPing(self):
       try:
-         with closing(SMBus(self.addr.bus)) as bus:
-            bus.read_byte(self.addr.address)
+         with self.request():
+            self.handle.smbus.read_byte(self.addr.address)
       except IOError:
          return False
       return True
 
    def read_byte_data(self, reg):
-      return self.bus.read_byte_data(self.addr.address, reg)
+      with self.request():
+         return self.handle.smbus.read_byte_data(self.addr.address, reg)
 
    def write_byte_data(self, reg, data):
-      return self.bus.write_byte_data(self.addr.address, reg, data)
+      with self.request():
+         return self.handle.smbus.write_byte_data(self.addr.address, reg, data)
 
    def read(self, reg):
       res = self.read_byte_data(reg)
@@ -20,23 +20,21 @@ class GpioRegister(Register):
       regval = self.parent.read(PCA9555_INPUT_REG + self.addr)
       return (regval >> bitpos) & 1
 
-   def writeBit(self, bitpos, value):
+   def writeBits(self, bits):
       if inSimulation():
          return
 
-      # Read output registers, update bit, and write back
+      # Read output registers, update bits, and write back
       # Doing the same for configuration registers,
       # in case they are modified unexpectedly.
       assert 0x0 <= self.addr <= 0x1
-      def _writeBit(addr, value):
+      def _writeBits(addr, setMask, clearMask):
          regval = self.parent.read(addr)
-         if value:
-            regval |= (1 << bitpos)
-         else:
-            regval &= ~(1 << bitpos)
-         self.parent.write(addr, regval)
-      _writeBit(PCA9555_OUTPUT_REG + self.addr, value)
-      _writeBit(PCA9555_CONFIG_REG + self.addr, False) # False for output
+         self.parent.write(addr, (regval | setMask) & ~clearMask)
+      setMask, clearMask = self.bitMasks(bits)
+      _writeBits(PCA9555_OUTPUT_REG + self.addr, setMask, clearMask)
+      # clearing the config bits sets the pins as output
+      _writeBits(PCA9555_CONFIG_REG + self.addr, 0, setMask | clearMask)
 
 class Pca9555I2cDevDriver(I2cDevDriver):
    def reset(self):
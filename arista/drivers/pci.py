@@ -1,4 +1,5 @@
 import os
+import threading
 
 from ..core.driver import KernelDriver
 from ..core.utils import FileWaiter, MmapResource
@@ -8,18 +9,35 @@ class PciKernelDriver(KernelDriver):
       self.addr = addr
       self.regs = registerCls(self) if registerCls is not None else None
       self.mmap_ = None
+      self.mmapLock_ = threading.Lock()
       super(PciKernelDriver, self).__init__(**kwargs)
 
    @property
    def mmap(self):
-      if self.mmap_ is None:
-         path = os.path.join(self.addr.getSysfsPath(), "resource0")
-         if not FileWaiter(path, 5).waitFileReady():
-            raise IOError('Mmap failed because file %s doesn\'t exist' % path)
-         self.mmap_ = MmapResource(path)
-         if not self.mmap_.map():
-            raise IOError('Failed to mmap file %s' % path)
-      return self.mmap_
+      mmap = self.mmap_
+      if mmap is not None:
+         return mmap
+      # the mapping can be shared by several threads, e.g. a presence poller
+      with self.mmapLock_:
+         if self.mmap_ is None:
+            path = os.path.join(self.addr.getSysfsPath(), "resource0")
+            if not FileWaiter(path, 5).waitFileReady():
+               raise IOError('Mmap failed because file %s doesn\'t exist' % path)
+            mmap = MmapResource(path)
+            if not mmap.map():
+               raise IOError('Failed to mmap file %s' % path)
+            self.mmap_ = mmap
+         return self.mmap_
+
+   def unmap(self):
+      with self.mmapLock_:
+         if self.mmap_ is not None:
+            self.mmap_.close()
+            self.mmap_ = None
+
+   def clean(self):
+      self.unmap()
+      super(PciKernelDriver, self).clean()
 
    def write(self, addr, value):
       self.mmap.write32(addr, value)
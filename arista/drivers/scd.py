@@ -73,18 +73,43 @@ class ScdKernelDriver(PciKernelDriver):
       path = os.path.join(self.addr.getSysfsPath(), 'smbus_tweaks')
       utils.FileWaiter(path, SCD_WAIT_TIMEOUT).waitFileReady()
 
+   def getMasterName(self):
+      return "SCD %s SMBus master %d bus %d" % (self.addr, 0, 0)
+
    def refresh(self):
       # reload i2c bus cache
-      masterName = "SCD %s SMBus master %d bus %d" % (self.addr, 0, 0)
       if not utils.inSimulation():
-         self.scd.i2cOffset = i2cBusFromName(masterName, force=True)
+         self.scd.i2cOffset = i2cBusFromName(self.getMasterName(), force=True)
       else:
          self.scd.i2cOffset = 2
 
+   def snapshotState(self):
+      if self.scd.i2cOffset is None:
+         return None
+      return {'i2cOffset': self.scd.i2cOffset}
+
+   def restoreState(self, state):
+      offset = state.get('i2cOffset')
+      if offset is None:
+         return False
+      if not utils.inSimulation():
+         # a single read instead of walking all the i2c adapters
+         path = '/sys/class/i2c-adapter/i2c-%d/name' % offset
+         try:
+            with open(path) as f:
+               if f.read().rstrip() != self.getMasterName():
+                  return False
+         except IOError:
+            return False
+      self.scd.i2cOffset = offset
+      return True
+
    def setup(self):
       super(ScdKernelDriver, self).setup()
 
       scd = self.scd
+      # the i2c tweaks of the xcvrs are only known once they are created
+      scd.materialize()
       data = []
 
       for addr, info in scd.smbusMasters.items():
@@ -174,20 +199,23 @@ class ScdResetRegister(Register):
       self.setAddr = addr
       self.clearAddr = addr + kwargs.get('clearOffset', 0x10)
 
-   def writeBit(self, bitpos, value):
+   def writeBits(self, bits):
       if inSimulation():
          return
 
-      if value:
-         self.parent.write(self.setAddr, 1 << bitpos)
-      else:
-         self.parent.write(self.clearAddr, 1 << bitpos)
+      setMask, clearMask = self.bitMasks(bits)
+      if setMask:
+         self.parent.write(self.setAddr, setMask)
+      if clearMask:
+         self.parent.write(self.clearAddr, clearMask)
+      for bitpos, value in bits.items():
+         self.updateSnapshotBit(self.setAddr, bitpos, value)
 
    def readBit(self, bitpos):
       if inSimulation():
          return 0
 
-      return (self.parent.read(self.setAddr) >> bitpos) & 1
+      return (self.readAddr(self.setAddr) >> bitpos) & 1
 
 class ScdStatusChangedRegister(Register):
    def __init__(self, addr, *fields, **kwargs):
@@ -198,6 +226,15 @@ class ScdStatusChangedRegister(Register):
          field.name = '%sChanged' % field.name
       self.changedRegister = ClearOnReadRegister(addr + 1, fields, **kwargs)
 
+   def clone(self):
+      reg = super(ScdStatusChangedRegister, self).clone()
+      reg.changedRegister = self.changedRegister.clone()
+      return reg
+
+   def setSnapshotState(self, state):
+      super(ScdStatusChangedRegister, self).setSnapshotState(state)
+      self.changedRegister.setSnapshotState(state)
+
    def generateAttributes(self, parent=None):
       attrs = super(ScdStatusChangedRegister, self).generateAttributes(parent)
       attrs.update(self.changedRegister.generateAttributes(parent))
@@ -1,6 +1,11 @@
 from __future__ import division, print_function, with_statement
 
 import os
+import threading
+import weakref
+
+from collections import OrderedDict
+from contextlib import contextmanager
 
 from ..core.driver import Driver
 from ..core import utils
@@ -8,12 +13,120 @@ from ..core.log import getLogger
 
 from ..inventory.xcvr import Xcvr
 
+from ..libs.fs import pread
+
 logging = getLogger(__name__)
 
+# sysfs attributes are at most a page long
+SYSFS_READ_SIZE = 4096
+
+class SysfsFdCache(object):
+   """LRU cache of open file descriptors for sysfs attributes.
+
+   sysfs regenerates the content of an attribute on every read at offset 0, so
+   a file can be kept open and re-read with a single pread instead of going
+   through open/read/close each time.
+   """
+   DEFAULT_SIZE = 128
+
+   caches_ = weakref.WeakSet()
+
+   def __init__(self, size=DEFAULT_SIZE):
+      self.size = size
+      self.fds = OrderedDict()
+      self.lock = threading.Lock()
+      SysfsFdCache.caches_.add(self)
+
+   def __del__(self):
+      self.clear()
+
+   def __len__(self):
+      return len(self.fds)
+
+   def __contains__(self, path):
+      return path in self.fds
+
+   def _evict(self, path):
+      fd = self.fds.pop(path, None)
+      if fd is not None:
+         try:
+            os.close(fd)
+         except OSError:
+            pass
+
+   def _open(self, path):
+      fd = os.open(path, os.O_RDONLY)
+      while len(self.fds) >= self.size:
+         self._evict(next(iter(self.fds)))
+      self.fds[path] = fd
+      return fd
+
+   def _read(self, path):
+      fd = self.fds.pop(path, None)
+      if fd is not None:
+         self.fds[path] = fd
+         try:
+            return pread(fd, SYSFS_READ_SIZE, 0)
+         except OSError:
+            # the node might have been removed and created again behind our back
+            logging.debug('stale sysfs fd for %s, reopening', path)
+            self._evict(path)
+      return pread(self._open(path), SYSFS_READ_SIZE, 0)
+
+   @staticmethod
+   def _decode(data):
+      if not isinstance(data, str):
+         data = data.decode()
+      return data
+
+   def read(self, path):
+      with self.lock:
+         try:
+            data = self._read(path)
+         except OSError as e:
+            self._evict(path)
+            raise IOError(e.errno, e.strerror, path)
+      return self._decode(data)
+
+   def readMany(self, paths):
+      """Read several attributes under a single lock acquisition.
+
+      Attributes that cannot be read are left out of the result.
+      """
+      res = {}
+      with self.lock:
+         for path in paths:
+            try:
+               res[path] = self._read(path)
+            except OSError:
+               self._evict(path)
+      return {path: self._decode(data) for path, data in res.items()}
+
+   def invalidate(self, prefix=None):
+      with self.lock:
+         for path in list(self.fds):
+            if prefix is None or path == prefix or \
+               path.startswith(prefix.rstrip('/') + '/'):
+               self._evict(path)
+
+   def clear(self):
+      self.invalidate()
+
+   @classmethod
+   def invalidateAll(cls, prefix=None):
+      for cache in list(cls.caches_):
+         cache.invalidate(prefix)
+
+class SysfsSnapshotState(threading.local):
+   snapshot = None
+
 class SysfsDriver(Driver):
-   def __init__(self, sysfsPath=None, addr=None, **kwargs):
+   def __init__(self, sysfsPath=None, addr=None,
+                fdCacheSize=SysfsFdCache.DEFAULT_SIZE, **kwargs):
       self.sysfsPath = sysfsPath
       self.addr = addr
+      self.fdCache = SysfsFdCache(fdCacheSize)
+      self.local_ = SysfsSnapshotState()
       super(SysfsDriver, self).__init__(**kwargs)
 
    def __str__(self):
@@ -28,22 +141,72 @@ class SysfsDriver(Driver):
    def read(self, name, path=None):
       if utils.inSimulation():
          return '0'
+      snapshot = self.local_.snapshot
+      if snapshot is not None and path is None and name in snapshot:
+         return snapshot[name]
       if not path and not self.sysfsPath:
          raise AttributeError
       path = path or os.path.join(self.sysfsPath, name)
-      with open(path, 'r') as f:
-         return f.read().rstrip()
+      return self.fdCache.read(path).rstrip()
+
+   def readMany(self, names):
+      """Read a group of attributes in one pass and return them as a dict.
+
+      Attributes that cannot be read are left out of the result.
+      """
+      if utils.inSimulation():
+         return {name: '0' for name in names}
+      if not self.sysfsPath:
+         raise AttributeError
+      paths = OrderedDict((os.path.join(self.sysfsPath, name), name)
+                          for name in names)
+      values = self.fdCache.readMany(paths)
+      return {paths[path]: value.rstrip() for path, value in values.items()}
+
+   @contextmanager
+   def snapshot(self, names):
+      """Serve reads of the given attributes from a single readMany pass.
+
+      Attributes missing from the snapshot are still read from hardware and
+      writes always go through.
+      """
+      previous = self.local_.snapshot
+      self.local_.snapshot = self.readMany(names)
+      try:
+         yield self.local_.snapshot
+      finally:
+         self.local_.snapshot = previous
 
    def write(self, name, value, path=None):
       if utils.inSimulation():
          return None
       if not path and not self.sysfsPath:
          raise AttributeError
+      snapshot = self.local_.snapshot
+      if snapshot is not None and path is None:
+         snapshot.pop(name, None)
       path = path or os.path.join(self.sysfsPath, name)
       with open(path, 'w') as f:
          return f.write(value)
 
+   def clean(self):
+      self.fdCache.clear()
+      super(SysfsDriver, self).clean()
+
 class PsuSysfsDriver(SysfsDriver):
+   def getPsuAttributes(self, psu):
+      return ['psu%d_%s' % (psu.psuId, attr) for attr in ['present', 'status']]
+
+   def snapshotPsus(self, psus):
+      names = utils.flatten(self.getPsuAttributes(psu) for psu in psus)
+      if names:
+         self.computeSysfsPath(names[0])
+      return self.snapshot(names)
+
+   def getPsuPresences(self, psus):
+      with self.snapshotPsus(psus):
+         return [self.getPsuPresence(psu) for psu in psus]
+
    def getPsuPresence(self, psu):
       gpio = 'psu%d_%s' % (psu.psuId, 'present')
       self.computeSysfsPath(gpio)
@@ -55,6 +218,10 @@ class PsuSysfsDriver(SysfsDriver):
       return self.read(gpio) == '1'
 
 class XcvrSysfsDriver(SysfsDriver):
+   def getXcvrPresences(self, xcvrs):
+      with self.snapshot(['%s_present' % xcvr.name for xcvr in xcvrs]):
+         return [self.getXcvrPresence(xcvr) for xcvr in xcvrs]
+
    def getXcvrPresence(self, xcvr):
       return self.read('%s_%s' % (xcvr.name, 'present')) == '1'
 
@@ -116,6 +283,20 @@ class FanSysfsDriver(SysfsDriver):
       super(FanSysfsDriver, self).setup()
       self.fileWaiter.waitFileReady()
 
+   def getFanAttributes(self, fan):
+      return ['pwm%s' % fan.fanId] + ['fan%s_%s' % (fan.fanId, attr)
+                                      for attr in ['present', 'fault', 'airflow']]
+
+   def snapshotFans(self, fans):
+      names = utils.flatten(self.getFanAttributes(fan) for fan in fans)
+      if names:
+         self.computeSysfsPath(names[0])
+      return self.snapshot(names)
+
+   def getFanPresences(self, fans):
+      with self.snapshotFans(fans):
+         return [self.getFanPresence(fan) for fan in fans]
+
    # Fan speeds are a percentage
    def getFanSpeed(self, fan):
       self.computeSysfsPath('pwm%s' % fan.fanId)
@@ -0,0 +1,193 @@
+from __future__ import absolute_import, division, print_function
+
+import threading
+import time
+
+from ...tests.testing import unittest, patch
+
+from ...core.component import Priority
+from ...core.types import I2cAddr
+
+from ..eeprom import SeepromI2cDevDriver
+from ..i2c import I2cBusPool, I2cBusScheduler, I2cDevDriver, i2cBusPool
+from ..psu import UpperlakePsuDriver
+
+class FakeSMBus(object):
+   opened = []
+
+   def __init__(self, bus):
+      self.bus = bus
+      self.closed = False
+      self.opened.append(self)
+
+   def read_byte(self, addr):
+      return 0
+
+   def read_byte_data(self, addr, reg):
+      return reg
+
+   def write_byte_data(self, addr, reg, data):
+      pass
+
+   def close(self):
+      self.closed = True
+
+@patch('arista.core.utils.SMBus', FakeSMBus)
+class I2cBusPoolTest(unittest.TestCase):
+   def setUp(self):
+      FakeSMBus.opened = []
+
+   def testAcquireSharesHandle(self):
+      pool = I2cBusPool()
+      first = pool.acquire(3)
+      second = pool.acquire(3)
+      other = pool.acquire(4)
+      self.assertIs(first, second)
+      self.assertIsNot(first, other)
+      self.assertIs(first.smbus, second.smbus)
+      self.assertEqual(first.refs, 2)
+
+   def testReleaseClosesLastReference(self):
+      pool = I2cBusPool()
+      first = pool.acquire(3)
+      second = pool.acquire(3)
+      bus = first.smbus
+      pool.release(first)
+      self.assertFalse(bus.closed)
+      pool.release(second)
+      self.assertTrue(bus.closed)
+      self.assertNotIn(3, pool.handles)
+      self.assertIsNot(pool.acquire(3), first)
+
+   def testLease(self):
+      pool = I2cBusPool()
+      with pool.lease(5) as handle:
+         self.assertEqual(handle.smbus.bus, 5)
+         self.assertEqual(handle.refs, 1)
+      self.assertEqual(handle.refs, 0)
+      self.assertTrue(handle.smbus_ is None)
+
+   def testDriversShareBus(self):
+      drivers = [I2cDevDriver(addr=I2cAddr(7, addr)) for addr in (0x10, 0x20)]
+      for driver in drivers:
+         self.assertTrue(driver.smbusPing())
+         self.assertEqual(driver.read_byte_data(0x2), 0x2)
+      self.assertEqual(len(FakeSMBus.opened), 1)
+      self.assertEqual(i2cBusPool.handles[7].refs, 2)
+      for driver in drivers:
+         driver.close()
+      self.assertTrue(FakeSMBus.opened[0].closed)
+      self.assertNotIn(7, i2cBusPool.handles)
+
+   def testPolledDriversKeepBusOpen(self):
+      class Psu(object):
+         psuId = 1
+      psu = UpperlakePsuDriver(addr=I2cAddr(8, 0x10))
+      seeprom = SeepromI2cDevDriver(addr=I2cAddr(8, 0x50))
+      for _ in range(3):
+         psu.getPsuStatus(Psu())
+         self.assertEqual(seeprom.read(), '\0' * 8)
+      self.assertEqual(len(FakeSMBus.opened), 1)
+      self.assertFalse(FakeSMBus.opened[0].closed)
+      psu.clean()
+      seeprom.clean()
+      self.assertTrue(FakeSMBus.opened[0].closed)
+      self.assertNotIn(8, i2cBusPool.handles)
+
+class I2cBusSchedulerTest(unittest.TestCase):
+   def setUp(self):
+      self.scheduler = I2cBusScheduler()
+      self.order = []
+      self.threads = []
+
+   def _queue(self, name, **kwargs):
+      def run():
+         with self.scheduler.request(**kwargs):
+            self.order.append(name)
+      count = len(self.scheduler.waiting)
+      thread = threading.Thread(target=run)
+      thread.start()
+      self.threads.append(thread)
+      while len(self.scheduler.waiting) == count:
+         time.sleep(0.001)
+
+   def _run(self, *requests):
+      with self.scheduler:
+         for name, kwargs in requests:
+            self._queue(name, **kwargs)
+      for thread in self.threads:
+         thread.join()
+      return self.order
+
+   def testThermalFirst(self):
+      order = self._run(
+         ('eeprom1', dict(priority=Priority.BACKGROUND, device=0x50)),
+         ('eeprom2', dict(priority=Priority.BACKGROUND, device=0x50)),
+         ('thermal', dict(priority=Priority.THERMAL, device=0x4c)),
+      )
+      self.assertEqual(order, ['thermal', 'eeprom1', 'eeprom2'])
+
+   def testThermalBeforeDefault(self):
+      order = self._run(
+         ('default', dict(priority=Priority.DEFAULT, device=0x20)),
+         ('thermal', dict(priority=Priority.THERMAL, device=0x4c)),
+      )
+      self.assertEqual(order, ['thermal', 'default'])
+
+   def testDeviceFairness(self):
+      with self.scheduler.request(device=0x50):
+         pass
+      order = self._run(
+         ('first', dict(device=0x50)),
+         ('second', dict(device=0x51)),
+      )
+      self.assertEqual(order, ['second', 'first'])
+
+   def testMissedDeadline(self):
+      order = self._run(
+         ('thermal', dict(priority=Priority.THERMAL, device=0x4c)),
+         ('late', dict(priority=Priority.BACKGROUND, device=0x50, deadline=0)),
+      )
+      self.assertEqual(order, ['late', 'thermal'])
+
+   def testInterruptedWait(self):
+      cond = self.scheduler.cond
+      wait = cond.wait
+      def interruptedWait(*args):
+         wait(*args)
+         if threading.current_thread().name == 'interrupted':
+            # let the other waiter go back to sleep before being interrupted
+            wait(0.05)
+            raise KeyboardInterrupt()
+      def run(name, priority):
+         try:
+            with self.scheduler.request(priority=priority):
+               self.order.append(name)
+         except KeyboardInterrupt:
+            pass
+      with patch.object(cond, 'wait', interruptedWait):
+         with self.scheduler:
+            for name, priority in [('interrupted', Priority.THERMAL),
+                                   ('other', Priority.BACKGROUND)]:
+               count = len(self.scheduler.waiting)
+               thread = threading.Thread(target=run, name=name,
+                                         args=(name, priority))
+               thread.daemon = True
+               thread.start()
+               self.threads.append(thread)
+               while len(self.scheduler.waiting) == count:
+                  time.sleep(0.001)
+         for thread in self.threads:
+            thread.join(1)
+            self.assertFalse(thread.is_alive())
+      self.assertEqual(self.order, ['other'])
+      self.assertEqual(self.scheduler.waiting, [])
+
+   def testReentrant(self):
+      with self.scheduler.request(device=0x50):
+         with self.scheduler.request(device=0x51):
+            self.assertEqual(self.scheduler.depth, 2)
+      self.assertIsNone(self.scheduler.owner)
+
+if __name__ == '__main__':
+   unittest.main()
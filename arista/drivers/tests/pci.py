@@ -0,0 +1,113 @@
+from __future__ import absolute_import, division, print_function
+
+import os
+import tempfile
+import threading
+import time
+import timeit
+
+from struct import unpack
+
+from ...tests.testing import unittest, patch
+from ...tests.logging import getLogger
+
+from ...core.register import Register, RegBitField, RegisterMap
+from ...core.types import PciAddr
+from ...core.utils import MmapResource
+from ...libs.fs import rmfile
+
+from ..pci import PciKernelDriver
+
+class FakePciRegisters(RegisterMap):
+   REVISION = Register(0x10, name='revision')
+   CONTROL = Register(0x14,
+      RegBitField(0, 'enable', ro=False),
+      RegBitField(1, 'busy'),
+      name='control', ro=False,
+   )
+
+class PciKernelDriverTest(unittest.TestCase):
+   @classmethod
+   def setUpClass(cls):
+      cls.logger = getLogger(cls.__name__)
+
+   def setUp(self):
+      fd, self.path = tempfile.mkstemp(prefix='unittest-arista-pci-')
+      os.write(fd, b'\0' * 4096)
+      os.close(fd)
+      self.driver = PciKernelDriver(addr=PciAddr(), module='fake',
+                                    registerCls=FakePciRegisters)
+      self.driver.mmap_ = MmapResource(self.path)
+      self.assertTrue(self.driver.mmap_.map())
+
+   def tearDown(self):
+      self.driver.unmap()
+      rmfile(self.path)
+
+   def testWordView(self):
+      if self.driver.mmap_.wordView() is None:
+         self.skipTest('word view not supported')
+      regs = self.driver.regs
+      self.driver.mmap_.write32(0x10, 0xcafe)
+      self.assertEqual(regs.revision(), 0xcafe)
+      regs.enable(1)
+      self.assertEqual(self.driver.mmap_.read32(0x14), 0x1)
+      self.assertEqual(regs.busy(), 0)
+      self.driver.write(0x16, 0x1)
+      self.assertEqual(self.driver.read(0x14), 0x10001)
+
+   def testUnmap(self):
+      self.driver.read(0x10)
+      self.driver.unmap()
+      self.assertIsNone(self.driver.mmap_)
+
+   def testConcurrentMap(self):
+      class SlowResource(MmapResource):
+         created = []
+         def map(self):
+            self.created.append(self)
+            time.sleep(0.01)
+            return super(SlowResource, self).map()
+
+      self.driver.unmap()
+      mapped = []
+      def run():
+         mapped.append(self.driver.mmap)
+      with patch('arista.drivers.pci.MmapResource', SlowResource), \
+           patch.object(PciAddr, 'getSysfsPath', return_value=''), \
+           patch('os.path.join', return_value=self.path):
+         threads = [threading.Thread(target=run) for _ in range(4)]
+         for thread in threads:
+            thread.start()
+         for thread in threads:
+            thread.join()
+      self.assertEqual(len(SlowResource.created), 1)
+      self.assertEqual(mapped, SlowResource.created * 4)
+
+   def testBenchmark(self):
+      resource = self.driver.mmap_
+      if resource.wordView() is None:
+         self.skipTest('word view not supported')
+      number = 20000
+
+      def sliceRead32(resource, addr):
+         # read32 as it was before the word view
+         return unpack('<L', resource.mmap_[addr:addr + 4])[0]
+
+      def indexed():
+         resource.read32(0x10)
+
+      def unpacked():
+         sliceRead32(resource, 0x10)
+
+      # interleave both variants to be less sensitive to noisy neighbours
+      words = sliced = float('inf')
+      for _ in range(5):
+         words = min(words, timeit.timeit(indexed, number=number))
+         sliced = min(sliced, timeit.timeit(unpacked, number=number))
+      self.logger.info('register read: %.3fus sliced, %.3fus with word view',
+                       sliced / number * 1e6, words / number * 1e6)
+      self.assertLess(words, sliced)
+
+if __name__ == '__main__':
+   unittest.main()
@@ -0,0 +1,115 @@
+from __future__ import absolute_import, division, print_function
+
+import os
+import shutil
+import tempfile
+
+from ...tests.testing import unittest, patch
+
+from ...inventory.xcvr import Xcvr
+
+from ..sysfs import FanSysfsDriver, SysfsDriver, SysfsFdCache, XcvrSysfsDriver
+
+class FakeFan(object):
+   def __init__(self, fanId):
+      self.fanId = fanId
+
+class FakeXcvr(object):
+   def __init__(self, xcvrId, xcvrType=Xcvr.QSFP):
+      self.xcvrType = xcvrType
+      self.name = '%s%d' % (Xcvr.typeStr(xcvrType), xcvrId)
+
+def mock_inSimulation():
+   return False
+
+@patch('arista.core.utils.inSimulation', mock_inSimulation)
+class SysfsFdCacheTest(unittest.TestCase):
+   def setUp(self):
+      self.path = tempfile.mkdtemp(prefix='unittest-arista-sysfs-')
+
+   def tearDown(self):
+      shutil.rmtree(self.path)
+
+   def _writeAttr(self, name, value):
+      path = os.path.join(self.path, name)
+      with open(path, 'w') as f:
+         f.write('%s\n' % value)
+      return path
+
+   def testReadKeepsFileOpen(self):
+      path = self._writeAttr('pwm1', 128)
+      driver = SysfsDriver(sysfsPath=self.path)
+      self.assertEqual(driver.read('pwm1'), '128')
+      self.assertIn(path, driver.fdCache)
+      self._writeAttr('pwm1', 255)
+      self.assertEqual(driver.read('pwm1'), '255')
+      self.assertEqual(len(driver.fdCache), 1)
+
+   def testLruEviction(self):
+      paths = [self._writeAttr('temp%d_input' % i, i) for i in range(3)]
+      driver = SysfsDriver(sysfsPath=self.path, fdCacheSize=2)
+      driver.read('temp0_input')
+      driver.read('temp1_input')
+      driver.read('temp0_input')
+      driver.read('temp2_input')
+      self.assertEqual(len(driver.fdCache), 2)
+      self.assertIn(paths[0], driver.fdCache)
+      self.assertNotIn(paths[1], driver.fdCache)
+      self.assertIn(paths[2], driver.fdCache)
+
+   def testMissingFile(self):
+      driver = SysfsDriver(sysfsPath=self.path)
+      with self.assertRaises(IOError):
+         driver.read('fan1_fault')
+      self.assertEqual(len(driver.fdCache), 0)
+
+   def testInvalidate(self):
+      path = self._writeAttr('psu1_present', 1)
+      driver = SysfsDriver(sysfsPath=self.path)
+      other = SysfsDriver(sysfsPath=self.path)
+      driver.read('psu1_present')
+      other.read('psu1_present')
+      SysfsFdCache.invalidateAll(self.path + 'x')
+      self.assertIn(path, driver.fdCache)
+      SysfsFdCache.invalidateAll(self.path)
+      self.assertNotIn(path, driver.fdCache)
+      self.assertNotIn(path, other.fdCache)
+
+      other.read('psu1_present')
+      other.clean()
+      self.assertEqual(len(other.fdCache), 0)
+
+   def testReadMany(self):
+      self._writeAttr('fan1_present', 1)
+      self._writeAttr('fan2_present', 0)
+      driver = SysfsDriver(sysfsPath=self.path)
+      values = driver.readMany(['fan1_present', 'fan2_present', 'fan3_present'])
+      self.assertEqual(values, {'fan1_present': '1', 'fan2_present': '0'})
+
+   def testSnapshot(self):
+      self._writeAttr('pwm1', 255)
+      self._writeAttr('fan1_present', 1)
+      self._writeAttr('fan1_airflow', 'forward')
+      fan = FakeFan(1)
+      driver = FanSysfsDriver(sysfsPath=self.path, maxPwm=255)
+      with driver.snapshotFans([fan]) as snapshot:
+         self._writeAttr('pwm1', 0)
+         self.assertEqual(driver.getFanSpeed(fan), 100)
+         self.assertTrue(driver.getFanPresence(fan))
+         self.assertNotIn('fan1_fault', snapshot)
+         self.assertTrue(driver.getFanStatus(fan))
+         driver.setFanSpeed(fan, 50)
+         self.assertEqual(driver.getFanSpeed(fan), 49)
+      self._writeAttr('pwm1', 0)
+      self.assertEqual(driver.getFanSpeed(fan), 0)
+
+   def testXcvrPresences(self):
+      xcvrs = [FakeXcvr(i) for i in range(4)]
+      for xcvr in xcvrs:
+         self._writeAttr('%s_present' % xcvr.name, int(xcvr.name[-1]) % 2)
+      driver = XcvrSysfsDriver(sysfsPath=self.path)
+      self.assertEqual(driver.getXcvrPresences(xcvrs),
+                       [False, True, False, True])
+
+if __name__ == '__main__':
+   unittest.main()
@@ -2,6 +2,8 @@
 import warnings
 
 class InventoryInterface(object):
+   __slots__ = ()
+
    def __diag__(self, ctx):
       warnings.warn('inventory objects should implement diag', DeprecationWarning)
       return {}
@@ -2,6 +2,8 @@
 from . import InventoryInterface
 
 class Fan(InventoryInterface):
+   __slots__ = ()
+
    def getName(self):
       raise NotImplementedError()
 
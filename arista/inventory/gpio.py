@@ -1,6 +1,8 @@
 from . import InventoryInterface
 
 class Gpio(InventoryInterface):
+   __slots__ = ()
+
    def getName(self):
       raise NotImplementedError()
 
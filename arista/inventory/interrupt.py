@@ -2,6 +2,8 @@
 from . import InventoryInterface
 
 class Interrupt(InventoryInterface):
+   __slots__ = ()
+
    def set(self):
       raise NotImplementedError()
 
@@ -2,6 +2,8 @@
 from . import InventoryInterface
 
 class Led(InventoryInterface):
+   __slots__ = ()
+
    def getColor(self):
       raise NotImplementedError()
 
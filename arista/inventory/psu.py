@@ -2,6 +2,8 @@
 from . import InventoryInterface
 
 class Psu(InventoryInterface):
+   __slots__ = ()
+
    def getName(self):
       raise NotImplementedError()
 
@@ -2,6 +2,8 @@
 from . import InventoryInterface
 
 class Reset(InventoryInterface):
+   __slots__ = ()
+
    def read(self):
       raise NotImplementedError()
 
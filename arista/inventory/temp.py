@@ -2,6 +2,8 @@
 from . import InventoryInterface
 
 class Temp(InventoryInterface):
+   __slots__ = ()
+
    def getTemperature(self):
       raise NotImplementedError
 
@@ -2,6 +2,7 @@
 from . import InventoryInterface
 
 class Xcvr(InventoryInterface):
+   __slots__ = ()
 
    SFP = 0
    QSFP = 1
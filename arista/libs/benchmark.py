@@ -1,5 +1,7 @@
 
 import contextlib
+import os
+import threading
 import time
 
 from ..core.log import getLogger
@@ -14,3 +16,74 @@ def timeit(message):
    finally:
       end = time.time()
       logging.debug('%s (took %s seconds)', message, end - begin)
+
+class Tracer(object):
+   '''Records timed spans as Chrome trace events (chrome://tracing, perfetto)'''
+   def __init__(self):
+      self.events = []
+      self.lock = threading.Lock()
+      self.local = threading.local()
+      self.begin = time.time()
+
+   def getStack(self):
+      stack = getattr(self.local, 'stack', None)
+      if stack is None:
+         stack = self.local.stack = []
+      return stack
+
+   def add(self, name, category, begin, end, args=None):
+      event = {
+         'name': name,
+         'cat': category,
+         'ph': 'X',
+         'ts': int((begin - self.begin) * 1e6),
+         'dur': int((end - begin) * 1e6),
+         'pid': os.getpid(),
+         'tid': threading.current_thread().name,
+      }
+      if args:
+         event['args'] = args
+      with self.lock:
+         self.events.append(event)
+
+   def slowest(self, count=10, category=None):
+      events = [e for e in self.events if category in (None, e['cat'])]
+      return sorted(events, key=lambda e: e['dur'], reverse=True)[:count]
+
+   def dump(self):
+      return {
+         'traceEvents': list(self.events),
+         'displayTimeUnit': 'ms',
+      }
+
+tracer_ = None
+
+def startTracing():
+   global tracer_
+   tracer_ = Tracer()
+   return tracer_
+
+def stopTracing():
+   global tracer_
+   tracer, tracer_ = tracer_, None
+   return tracer
+
+@contextlib.contextmanager
+def traced(name, category, **args):
+   '''Record the duration of a block when tracing is enabled
+
+   Nested blocks of the same thread get the path of their parents.
+   '''
+   tracer = tracer_
+   if tracer is None:
+      yield
+      return
+   stack = tracer.getStack()
+   stack.append(name)
+   args['path'] = '/'.join(stack)
+   begin = time.time()
+   try:
+      yield
+   finally:
+      tracer.add(name, category, begin, time.time(), args)
+      stack.pop()
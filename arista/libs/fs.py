@@ -17,3 +17,10 @@ def rmfile(path, raises=False):
    except (OSError, IOError):
       if raises:
          raise
+
+if hasattr(os, 'pread'):
+   pread = os.pread
+else:
+   def pread(fd, size, offset):
+      os.lseek(fd, offset, os.SEEK_SET)
+      return os.read(fd, size)
@@ -0,0 +1,71 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_ONLYDIR = 0x01000000
+
+IN_CLOEXEC = 0o2000000
+IN_NONBLOCK = 0o4000
+
+libc_ = None
+
+def _getLibc():
+   global libc_
+   if libc_ is None:
+      libc_ = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6',
+                          use_errno=True)
+   return libc_
+
+def _check(res):
+   if res < 0:
+      err = ctypes.get_errno()
+      raise OSError(err, os.strerror(err))
+   return res
+
+class Inotify(object):
+   '''Minimal inotify binding, only used to get woken up on events'''
+   def __init__(self):
+      self.libc = _getLibc()
+      self.fd = _check(self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC))
+      self.watches = {}
+
+   def addWatch(self, path, mask=IN_CREATE | IN_MOVED_TO | IN_ONLYDIR):
+      if path in self.watches:
+         return self.watches[path]
+      wd = _check(self.libc.inotify_add_watch(self.fd, path.encode(), mask))
+      self.watches[path] = wd
+      return wd
+
+   def wait(self, timeout):
+      '''Wait up to timeout seconds for events, returns True if any'''
+      try:
+         ready, _, _ = select.select([self.fd], [], [], timeout)
+      except select.error as e:
+         if e.args[0] != errno.EINTR:
+            raise
+         return False
+      if not ready:
+         return False
+      try:
+         # the events themselves are not needed, the caller checks its condition
+         while os.read(self.fd, 4096):
+            pass
+      except OSError as e:
+         if e.errno != errno.EAGAIN:
+            raise
+      return True
+
+   def close(self):
+      if self.fd is not None:
+         os.close(self.fd)
+         self.fd = None
+
+   def __enter__(self):
+      return self
+
+   def __exit__(self, *args):
+      self.close()
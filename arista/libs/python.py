@@ -7,3 +7,26 @@ if sys.version_info.major == 2:
 else:
    def isinteger(value):
       return isinstance(value, int)
+
+def slotNames(cls):
+   '''Names of the attribute slots declared by cls and its bases'''
+   names = []
+   for klass in reversed(cls.__mro__):
+      for name in klass.__dict__.get('__slots__', ()):
+         if name not in ('__dict__', '__weakref__') and name not in names:
+            names.append(name)
+   return names
+
+def setAttrs(obj, attrs):
+   '''Set attributes on obj whether they are slots or extra attributes'''
+   for key, value in attrs.items():
+      setattr(obj, key, value)
+
+def getAttrs(obj):
+   '''Dict of the attributes set on obj, slots and extra attributes'''
+   attrs = {}
+   for name in slotNames(obj.__class__):
+      if hasattr(obj, name):
+         attrs[name] = getattr(obj, name)
+   attrs.update(getattr(obj, '__dict__', {}))
+   return attrs
@@ -1,5 +1,9 @@
 
 from __future__ import absolute_import, division, print_function
-from ..core.dynload import importSubmodules
+from ..core.dynload import importSubmodules, iter_modules
 
-__all__ = importSubmodules(__package__).keys()
+__all__ = [info.name for info in iter_modules(__path__)]
+
+def loadAll():
+   '''Import all the platform definitions, registering them'''
+   return importSubmodules(__package__)
@@ -2,14 +2,13 @@
 
 from __future__ import division, print_function
 
-import copy
-import select
 import time
 
 try:
    from sonic_platform_base.chassis_base import ChassisBase
    from arista.core import cause
    from arista.core.config import Config
+   from arista.core.event import EventEngine, PresencePoller
    from arista.core.platform import readPrefdl
    from arista.utils.sonic_platform.fan import Fan
    from arista.utils.sonic_platform.psu import Psu
@@ -37,21 +36,27 @@ class Chassis(ChassisBase):
       ChassisBase.__init__(self)
       self._prefdl = readPrefdl()
       self._inventory = inventory
+      # inventory objects behind the sonic ones, used for batched polling
+      self._inventory_items = {}
       for fan in self._inventory.getFans():
-         self._fan_list.append(Fan(fan))
+         self._fan_list.append(self._wrap(Fan, fan))
       for psu in self._inventory.getPsus():
-         self._psu_list.append(Psu(psu))
+         self._psu_list.append(self._wrap(Psu, psu))
       self._sfp_list = []
       if inventory and inventory.portEnd:
          self._sfp_list = [None] * (inventory.portEnd + 1)
          for index, sfp in self._inventory.getXcvrs().items():
-            self._sfp_list[index] = Sfp(index, sfp)
+            self._sfp_list[index] = self._wrap(Sfp, index, sfp)
       for thermal in self._inventory.getTemps():
-         self._thermal_list.append(Thermal(thermal))
+         self._thermal_list.append(self._wrap(Thermal, thermal))
       self._watchdog = Watchdog(self._inventory.getWatchdog())
 
-      self._interrupt_dict, self._presence_dict = \
-         self._get_interrupts_for_components()
+      self._event_engine = None
+
+   def _wrap(self, cls, *args):
+      component = cls(*args)
+      self._inventory_items[id(component)] = args[-1]
+      return component
 
    def get_presence(self):
       return True
@@ -87,79 +92,64 @@ class Chassis(ChassisBase):
             return (retCause, retDesc)
       return unknown
 
-   def _get_interrupts_for_components(self):
-      interrupt_dict = {
-         'component': {},
-         'fan': {},
-         'module': {},
-         'psu': {},
-         'sfp': {},
-         'thermal': {},
-      }
-      presence_dict = copy.deepcopy(interrupt_dict)
-
-      def process_component(component_type, component):
-         if not component:
-            return
-         interrupt_file = component.get_interrupt_file()
-         if interrupt_file:
-            interrupt_dict[component_type][component.get_name()] = \
-               (component, interrupt_file)
-         else:
-            presence_dict[component_type][component.get_name()] = \
-               (component, component.get_presence())
-
+   def _iter_event_components(self):
       for component in self._component_list:
-         process_component('component', component)
+         yield 'component', component
       for fan in self._fan_list:
-         process_component('fan', fan)
+         yield 'fan', fan
       for module in self._module_list:
-         process_component('module', module)
+         yield 'module', module
       for psu in self._psu_list:
-         process_component('psu', psu)
+         yield 'psu', psu
       for sfp in self._sfp_list:
-         process_component('sfp', sfp)
+         yield 'sfp', sfp
       for thermal in self._thermal_list:
-         process_component('thermal', thermal)
-      return interrupt_dict, presence_dict
-
-   def _process_epoll_result(self, epoll, poll_ret, open_files, res_dict):
-      detected = False
-      poll_ret = dict(poll_ret)
-      for fd in poll_ret:
-         if fd in open_files:
-            detected = True
-            component_type, component, open_file = open_files[fd]
-            res_dict[component_type][component.get_name()] = '1' \
-               if component.get_presence() else '0'
-            epoll.unregister(fd)
-            open_file.close()
-            component.clear_interrupt()
-            del open_files[fd]
-            newFile = open(component.get_interrupt_file())
-            open_files[newFile.fileno()] = (component_type, component, newFile)
-            epoll.register(newFile.fileno(), select.EPOLLIN)
-      return detected
-
-   def _process_poll_result(self, res_dict):
-      detected = False
-      for component_type, component_names in self._presence_dict.items():
-         for component_name, (component, old_presence) in component_names.items():
-            presence = component.get_presence()
-            if presence != old_presence:
-               detected = True
-               res_dict[component_type][component_name] = '1' if \
-                     presence else '0'
-               self._presence_dict[component_type][component_name] = \
-                     (component, presence)
-      return detected
+         yield 'thermal', thermal
+
+   def _get_event_engine(self):
+      """Event engine kept for the lifetime of the chassis
+
+      Components with an interrupt file are registered once and only
+      re-armed when they fire, the presence of the others is polled every
+      POLL_INTERVAL by a background thread.
+      """
+      if self._event_engine is None:
+         engine = EventEngine(pollInterval=self.POLL_INTERVAL / 1000.)
+         poller = PresencePoller(interval=self.POLL_INTERVAL / 1000.)
+         for component_type, component in self._iter_event_components():
+            if not component:
+               continue
+            key = (component_type, component)
+            interrupt_file = component.get_interrupt_file()
+            item = self._inventory_items.get(id(component))
+            if interrupt_file:
+               engine.addInterrupt(key, interrupt_file, component.clear_interrupt)
+            elif item is not None:
+               poller.add(component_type, key, item)
+            else:
+               engine.addPolled(key, component.get_presence)
+         poller.reset()
+         engine.addPoller(poller)
+         poller.start()
+         self._event_engine = engine
+      return self._event_engine
+
+   def close(self):
+      '''Stop the presence poller thread and release the event engine'''
+      # __init__ may not have completed when called from __del__
+      engine = getattr(self, '_event_engine', None)
+      if engine is not None:
+         engine.close()
+         self._event_engine = None
+
+   def __del__(self):
+      self.close()
 
    def get_change_event(self, timeout=0):
+      engine = self._get_event_engine()
       if not Config().persistent_presence_check:
-         self._interrupt_dict, self._presence_dict = \
-            self._get_interrupts_for_components()
+         engine.resetPolled()
 
-      open_files = {}
       res_dict = {
          'component': {},
          'fan': {},
@@ -170,44 +160,25 @@ class Chassis(ChassisBase):
       }
       block = (timeout == 0)
 
-      epoll = select.epoll()
-
-      for component_type in self._interrupt_dict:
-         component_dict = self._interrupt_dict[component_type]
-         for component_name in component_dict:
-            component, interrupt_file = component_dict[component_name]
-            component.clear_interrupt()
-            open_file = open(interrupt_file)
-            open_files[open_file.fileno()] = (component_type, component, open_file)
-            epoll.register(open_file.fileno(), select.EPOLLIN)
-
       while True:
          timer_value = min(timeout, self.POLL_INTERVAL/1000.) if not block else \
                        self.POLL_INTERVAL/1000.
          pre_time = time.time()
 
-         epoll_detected = False
-         try:
-            poll_ret = epoll.poll(timer_value)
-            if poll_ret:
-               epoll_detected = self._process_epoll_result(epoll, poll_ret,
-                                                           open_files, res_dict)
-         except select.error:
-            pass
-
-         poll_detected = self._process_poll_result(res_dict)
+         events = engine.wait(timer_value)
+         for (component_type, component), presence in events.items():
+            if presence is None:
+               presence = component.get_presence()
+            res_dict[component_type][component.get_name()] = \
+               '1' if presence else '0'
 
-         detected = epoll_detected or poll_detected
+         detected = bool(events)
          if detected and block or timeout == 0 and not block:
             break
 
          real_elapsed_time = min(time.time() - pre_time, timeout)
          timeout = round(timeout - real_elapsed_time, 3)
 
-      for _, _, open_file in open_files.values():
-         open_file.close()
-      epoll.close()
-
       return res_dict
 
    def get_thermal_manager(self):
@@ -4,7 +4,6 @@ from __future__ import print_function
 
 try:
    from sonic_platform_base.platform_base import PlatformBase
-   import arista.platforms
    from arista.core.platform import getPlatform
    from arista.utils.sonic_platform.chassis import Chassis
 except ImportError as e:
@@ -1,6 +1,7 @@
-import select
 import time
 
+from ..core.config import Config
+from ..core.event import EventEngine
 from .sonic_utils import getInventory
 
 try:
@@ -49,6 +50,8 @@ def getSfpUtil():
 
     class SfpUtilNative(SfpUtilCommon):
         """Native Sonic SfpUtil class"""
+        _event_engine = None
+
         def get_presence(self, port_num):
             if not self._is_valid_port(port_num):
                 return False
@@ -96,34 +99,35 @@ def getSfpUtil():
 
             return True
 
-        def get_transceiver_change_event(self, timeout=0):
-            xcvrs = inventory.getXcvrs()
-            epoll = select.epoll()
-            openFiles = []
-            ret = {}
-            try:
-               # Clear the interrupt masks
-               for xcvr in xcvrs.values():
+        def _get_event_engine(self):
+            # xcvr interrupt files are registered once and only the lines
+            # that fired get cleared and reopened
+            if self._event_engine is None:
+               engine = EventEngine(coalesce=Config().xcvr_event_coalesce)
+               for xcvr in inventory.getXcvrs().values():
                   intr = xcvr.getInterruptLine()
                   if not intr:
                      continue
-                  xcvr.getPresence()
-                  intr.clear()
-                  openFile = open(intr.getFile())
-                  openFiles.append((xcvr, openFile))
-                  epoll.register(openFile.fileno(), select.EPOLLIN)
-               pollRet = epoll.poll(timeout=timeout if timeout != 0 else -1)
-               if pollRet:
-                  pollRet = dict(pollRet)
-                  for xcvr, openFile in openFiles:
-                     if openFile.fileno() in pollRet:
-                        ret[str(xcvr.xcvrId)] = '1' if xcvr.getPresence() else '0'
-                  return True, ret
-            finally:
-               for _, openFile in openFiles:
-                  openFile.close()
-               epoll.close()
-
-            return False, {}
+                  engine.addInterrupt(xcvr, intr.getFile(),
+                                      self._make_rearm(xcvr, intr))
+               self._event_engine = engine
+            return self._event_engine
+
+        @staticmethod
+        def _make_rearm(xcvr, intr):
+            def rearm():
+               xcvr.getPresence()
+               intr.clear()
+            return rearm
+
+        def get_transceiver_change_event(self, timeout=0):
+            engine = self._get_event_engine()
+            events = engine.wait(timeout if timeout != 0 else None)
+            if not events:
+               return False, {}
+            ret = {}
+            for xcvr in events:
+               ret[str(xcvr.xcvrId)] = '1' if xcvr.getPresence() else '0'
+            return True, ret
 
     return SfpUtilNative